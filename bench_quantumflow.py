@@ -0,0 +1,347 @@
+"""Headless benchmark for quantumflow_dashboard_v2.py.
+
+Drives the app with Streamlit's AppTest (no browser) and records, per
+scenario, wall time of full reruns and the peak Python heap allocated
+during one rerun (tracemalloc):
+
+- views: HOME, MARKETS (focus assets), SCREENER, NEWS and ASSET_DETAIL
+- interactions: switching the risk-profile radio, adding to the watchlist,
+  toggling the forecast band on the asset chart, and sorting, filtering and
+  paging the screener
+- startup: the very first HOME run against empty caches
+
+Each universe size runs in its own subprocess with a fresh cache directory,
+because the app's st.cache_resource state is process-wide. A size N sets
+QF_UNIVERSE_SIZE=N and, unless pinned with flags, QF_CORE_SIZE=N / 10 (the
+names with stored history), a watchlist of up to N - 2 symbols and a portfolio
+of N lots spread evenly over min(N, 200) symbols of the whole universe, so
+long-tail holdings outside the store are exercised too. Results go to a JSON
+file; pass a previous one with --compare to fail on regressions:
+
+    python bench_quantumflow.py --sizes 9,1000,10000 --output bench_output.txt
+    python bench_quantumflow.py --sizes 9,1000 --compare baseline.json --tolerance 0.25
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quantumflow_dashboard_v2.py")
+# Scenario view -> (app view, main tab, markets mode).
+VIEWS = {
+    "HOME": ("HOME", "HOME", None),
+    "MARKETS": ("MARKETS", "MARKETS", "Focus assets"),
+    "SCREENER": ("MARKETS", "MARKETS", "Screener"),
+    "NEWS": ("NEWS", "NEWS", None),
+    "ASSET_DETAIL": ("ASSET_DETAIL", "HOME", None),
+}
+ASSET_TICKER = "NVDA"
+# Left out of the seeded watchlist so "Add" still has a candidate after adding one.
+WATCHLIST_HELD_BACK = ("BTC-USD", "ETH-USD")
+# Bars are calendar days; the risk engine and optimizer need a year of them.
+MIN_HISTORY_DAYS = 400
+RUN_TIMEOUT_SECONDS = 600
+# Distinct symbols the default portfolio is spread over; the optimizer's covariance is quadratic in it.
+DEFAULT_MAX_HELD = 200
+
+
+def load_app_module():
+    spec = importlib.util.spec_from_file_location("quantumflow_bench_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def seed_session(app, n_watchlist: int, n_lots: int, n_held: int, history_start: date):
+    """Watchlist drawn from the universe and `n_lots` lots over `n_held` symbols spaced evenly across it."""
+    import pandas as pd
+
+    universe = app.get_symbol_universe()
+    watchlist = [t for t in universe if t not in WATCHLIST_HELD_BACK][:n_watchlist]
+    held = universe[:: max(len(universe) // max(n_held, 1), 1)][:n_held]
+    span = max((date.today() - history_start).days - 1, 1)
+    lots = [
+        {
+            "ticker": held[i % len(held)],
+            "shares": 1 + i % 25,
+            "buy_price": 100.0 + i % 97,
+            "buy_date": (history_start + timedelta(days=(i * 37) % span)).isoformat(),
+            "current_price": 110.0 + i % 89,
+        }
+        for i in range(n_lots)
+    ]
+    return watchlist, pd.DataFrame(lots)
+
+
+def new_session(app, watchlist, portfolio):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT_SECONDS)
+    at.session_state["watchlist"] = list(watchlist)
+    at.session_state["ledger"] = app.HoldingsLedger.from_frame(portfolio)
+    return at
+
+
+def go_to(at, view: str):
+    app_view, main_tab, markets_mode = VIEWS[view]
+    at.session_state["view"] = app_view
+    at.session_state["main_tab"] = main_tab
+    at.session_state["selected_ticker"] = ASSET_TICKER if view == "ASSET_DETAIL" else None
+    if markets_mode is not None:
+        at.session_state["markets_mode"] = markets_mode
+
+
+def widget(elements, label: str):
+    return next(e for e in elements if e.label == label)
+
+
+def timed_run(at, step=None, trace: bool = False):
+    """(seconds, peak heap bytes above the starting level or None, error or None) for one rerun."""
+    if step is not None:
+        step(at)
+    if trace:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - base if trace else None
+    error = "; ".join(e.message for e in at.exception) if len(at.exception) else None
+    return elapsed, peak, error
+
+
+def measure(at, step, repeats: int):
+    """One warm-up rerun, `repeats` timed reruns, then one traced rerun for peak memory."""
+    first, _, error = timed_run(at, step)
+    times = []
+    for _ in range(repeats):
+        elapsed, _, err = timed_run(at, step)
+        times.append(elapsed)
+        error = error or err
+    tracemalloc.start()
+    try:
+        _, peak, err = timed_run(at, step, trace=True)
+    finally:
+        tracemalloc.stop()
+    times.sort()
+    return {
+        "first_ms": first * 1000,
+        "median_ms": statistics.median(times) * 1000,
+        "p95_ms": times[min(len(times) - 1, int(round(0.95 * (len(times) - 1))))] * 1000,
+        "min_ms": times[0] * 1000,
+        "repeats": repeats,
+        "peak_alloc_mb": peak / 1024**2,
+        "error": error or err,
+    }
+
+
+def run_worker(config):
+    """All scenarios for one configuration, in this (fresh) process."""
+    app = load_app_module()
+    history_start = app.HISTORY_EPOCH.date()
+    watchlist, portfolio = seed_session(
+        app, config["watchlist"], config["portfolio_rows"], config["held"], history_start
+    )
+    repeats = config["repeats"]
+    scenarios = {}
+
+    at = new_session(app, watchlist, portfolio)
+    tracemalloc.start()
+    try:
+        elapsed, peak, error = timed_run(at, trace=True)
+    finally:
+        tracemalloc.stop()
+    scenarios["startup"] = {"first_ms": elapsed * 1000, "peak_alloc_mb": peak / 1024**2, "error": error}
+
+    for view in VIEWS:
+        at = new_session(app, watchlist, portfolio)
+        at.run()
+        go_to(at, view)
+        scenarios[f"view:{view}"] = measure(at, None, repeats)
+
+    at = new_session(app, watchlist, portfolio)
+    at.run()
+    profiles = iter(["Conservative", "Aggressive", "Moderate"] * (repeats + 2))
+    scenarios["interaction:profile_radio"] = measure(
+        at, lambda at: widget(at.sidebar.radio, "Risk appetite").set_value(next(profiles)), repeats
+    )
+
+    def add_to_watchlist(at):
+        at.session_state["watchlist"] = list(watchlist)
+        at.button(key="add_watchlist").click()
+
+    scenarios["interaction:watchlist_add"] = measure(at, add_to_watchlist, repeats)
+
+    at = new_session(app, watchlist, portfolio)
+    at.run()
+    go_to(at, "ASSET_DETAIL")
+    at.run()
+
+    def toggle_forecast(at):
+        checkbox = widget(at.checkbox, "Show model forecast band")
+        checkbox.set_value(not checkbox.value)
+
+    scenarios["interaction:forecast_toggle"] = measure(at, toggle_forecast, repeats)
+
+    at = new_session(app, watchlist, portfolio)
+    go_to(at, "SCREENER")
+    at.run()
+    sorts = itertools.cycle(list(app.SCREENER_SORT_COLUMNS)[1:] + list(app.SCREENER_SORT_COLUMNS)[:1])
+    scenarios["interaction:screener_sort"] = measure(
+        at, lambda at: at.selectbox(key="screener_sort").set_value(next(sorts)), repeats
+    )
+    actions = itertools.cycle([[str(action)] for action in app.DECISION_ACTIONS] + [[]])
+    scenarios["interaction:screener_filter"] = measure(
+        at, lambda at: at.multiselect(key="screener_actions").set_value(next(actions)), repeats
+    )
+
+    def next_page(at):
+        page = at.number_input(key="screener_page")
+        page.set_value(page.value % page.max + 1)
+
+    scenarios["interaction:screener_page"] = measure(at, next_page, repeats)
+
+    return {
+        "config": config,
+        "history_start": history_start.isoformat(),
+        "universe": len(app.get_symbol_universe()),
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "scenarios": scenarios,
+    }
+
+
+def run_config(config):
+    """Run one configuration in a subprocess with its own cache directory."""
+    with tempfile.TemporaryDirectory(prefix="qf-bench-") as cache_dir:
+        env = {
+            **os.environ,
+            "QF_CACHE_DIR": cache_dir,
+            "QF_UNIVERSE_SIZE": str(config["size"]),
+            "QF_CORE_SIZE": str(config["core"]),
+        }
+        env.pop("QF_PROFILE", None)
+        if config["history_days"]:
+            env["QF_HISTORY_START"] = (date.today() - timedelta(days=config["history_days"])).isoformat()
+        result_path = os.path.join(cache_dir, "result.json")
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", json.dumps(config), "--output", result_path]
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if proc.returncode != 0 or not os.path.exists(result_path):
+            return {"config": config, "error": proc.stderr[-4000:]}
+        with open(result_path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def compare(results, baseline_path: str, tolerance: float):
+    """Scenario medians (or first runs) slower than the baseline by more than `tolerance`."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["config"]["size"]: r for r in json.load(f)["results"] if "scenarios" in r}
+    regressions = []
+    for result in results:
+        old = baseline.get(result["config"]["size"])
+        if old is None or "scenarios" not in result:
+            continue
+        for name, stats in result["scenarios"].items():
+            metric = "median_ms" if "median_ms" in stats else "first_ms"
+            before = old["scenarios"].get(name, {}).get(metric)
+            if before and stats[metric] > before * (1 + tolerance):
+                regressions.append(f"size={result['config']['size']} {name}: {before:.0f} -> {stats[metric]:.0f} ms")
+    return regressions
+
+
+def print_table(results):
+    for result in results:
+        if "scenarios" not in result:
+            print(f"size={result['config']['size']}: FAILED\n{result['error']}")
+            continue
+        cfg = result["config"]
+        print(
+            f"\nsize={cfg['size']} core={cfg['core']} watchlist={cfg['watchlist']} "
+            f"lots={cfg['portfolio_rows']} over {cfg['held']} symbols "
+            f"history from {result['history_start']} (max RSS {result['max_rss_mb']:.0f} MB)"
+        )
+        print(f"  {'scenario':32} {'first':>9} {'median':>9} {'p95':>9} {'peak MB':>9}")
+        for name, stats in result["scenarios"].items():
+            flag = "  ERROR" if stats.get("error") else ""
+            print(
+                f"  {name:32} {stats['first_ms']:9.0f} {stats.get('median_ms', float('nan')):9.0f} "
+                f"{stats.get('p95_ms', float('nan')):9.0f} {stats['peak_alloc_mb']:9.1f}{flag}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--sizes", default=os.environ.get("QF_BENCH_SIZES", "9,500"), help="comma-separated universe sizes (9 to 10000)"
+    )
+    parser.add_argument("--core", type=int, help="core tickers with stored history (default: size / 10, at least 9)")
+    parser.add_argument("--watchlist", type=int, help="watchlist length (default: size - 2)")
+    parser.add_argument("--portfolio-rows", type=int, help="portfolio lots (default: size)")
+    parser.add_argument(
+        "--held", type=int, help=f"distinct symbols the lots are spread over (default: min(size, {DEFAULT_MAX_HELD}))"
+    )
+    parser.add_argument(
+        "--history-days", type=int, help=f"days of stored history (min {MIN_HISTORY_DAYS}; default: the app's epoch)"
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="timed reruns per scenario")
+    parser.add_argument("--output", default="bench_output.txt", help="JSON results file")
+    parser.add_argument("--compare", help="previous results file; exit 1 if any scenario regressed")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown for --compare")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(json.loads(args.worker))
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return 0
+
+    if args.history_days is not None and args.history_days < MIN_HISTORY_DAYS:
+        parser.error(f"--history-days must be at least {MIN_HISTORY_DAYS}")
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        config = {
+            "size": size,
+            "core": args.core if args.core is not None else max(size // 10, 9),
+            "watchlist": args.watchlist if args.watchlist is not None else max(size - len(WATCHLIST_HELD_BACK), 1),
+            "portfolio_rows": args.portfolio_rows if args.portfolio_rows is not None else size,
+            "held": args.held if args.held is not None else min(size, DEFAULT_MAX_HELD),
+            "history_days": args.history_days,
+            "repeats": args.repeats,
+        }
+        print(f"benchmarking size={size} ...", flush=True)
+        results.append(run_config(config))
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_table(results)
+    print(f"\nwrote {args.output}")
+
+    failed = any("scenarios" not in r or any(s.get("error") for s in r["scenarios"].values()) for r in results)
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
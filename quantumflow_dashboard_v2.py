@@ -11,11 +11,38 @@ Changes vs previous version:
 - NEWS: vertical split between news articles + social signals (X / Reddit)
 """
 
+import abc
+import functools
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from statistics import NormalDist
+
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+
+from quantumflow_mc import simulate_portfolio_chunk
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+except ImportError:  # older Streamlit: loader threads simply run without a script context
+    add_script_run_ctx = get_script_run_ctx = None
 
 # -----------------------------------------------------------------------------
 # Page + Global Style
@@ -138,11 +165,154 @@ def rerun_app():
         st.experimental_rerun()
 
 
+def fragment(func):
+    """Let `func` rerun on its own when its widgets change (plain call on older Streamlit)."""
+    if hasattr(st, "fragment"):
+        return st.fragment(func)
+    if hasattr(st, "experimental_fragment"):
+        return st.experimental_fragment(func)
+    return func
+
+
+def rerun_fragment():
+    """Rerun only the calling fragment where supported, else the whole app.
+
+    Streamlit refuses a fragment-scoped rerun while the full script is
+    running (e.g. a fragment's button handled during a full rerun, as
+    AppTest does), so that case falls back to rerunning the app.
+    """
+    if hasattr(st, "fragment"):
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            rerun_app()
+    else:
+        rerun_app()
+
+
+# -----------------------------------------------------------------------------
+# Helpers: latency profiler (QF_PROFILE=1)
+# -----------------------------------------------------------------------------
+
+PROFILE_ENABLED = os.environ.get("QF_PROFILE", "").lower() not in ("", "0", "false", "no")
+PROFILE_SAMPLES_PER_FUNCTION = 4096
+PROFILE_PERCENTILES = (50, 95, 99)
+
+
+class LatencyProfiler:
+    """Wall-clock timings of instrumented functions, pooled across sessions.
+
+    Every call records its inclusive time and its self time (inclusive minus
+    instrumented callees) into a fixed-size ring per function, so
+    percentiles reflect the most recent PROFILE_SAMPLES_PER_FUNCTION calls.
+    Call paths ("main > render_home > render_top_picks") keep running
+    totals. Each thread has its own call stack, so work on loader and
+    refresh threads shows up as separate roots.
+    """
+
+    def __init__(self, max_samples: int = PROFILE_SAMPLES_PER_FUNCTION):
+        self.max_samples = max_samples
+        self._samples = {}
+        self._paths = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def record(self, path: str, name: str, elapsed: float, own: float):
+        with self._lock:
+            entry = self._samples.get(name)
+            if entry is None:
+                entry = self._samples[name] = [np.zeros((2, self.max_samples)), 0]
+            entry[0][:, entry[1] % self.max_samples] = (elapsed, own)
+            entry[1] += 1
+            totals = self._paths.setdefault(path, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._paths.clear()
+
+    def summary(self):
+        """One row per function: calls, mean and percentile latencies (ms), slowest total first."""
+        n = self.max_samples
+        with self._lock:
+            samples = {name: (ring[:, : min(count, n)].copy(), count) for name, (ring, count) in self._samples.items()}
+        rows = []
+        for name, (ring, count) in samples.items():
+            inclusive, own = ring * 1000.0
+            row = {"function": name, "calls": count, "mean_ms": inclusive.mean()}
+            for q, value in zip(PROFILE_PERCENTILES, np.percentile(inclusive, PROFILE_PERCENTILES)):
+                row[f"p{q}_ms"] = value
+            row["max_ms"] = inclusive.max()
+            row["self_mean_ms"] = own.mean()
+            row["self_p95_ms"] = np.percentile(own, 95)
+            row["est_total_ms"] = row["mean_ms"] * count
+            rows.append(row)
+        columns = ["function", "calls", "mean_ms", *(f"p{q}_ms" for q in PROFILE_PERCENTILES)]
+        columns += ["max_ms", "self_mean_ms", "self_p95_ms", "est_total_ms"]
+        return pd.DataFrame(rows, columns=columns).sort_values("est_total_ms", ascending=False, ignore_index=True)
+
+    def paths(self):
+        """One row per call path with its depth, call count and total/mean time (ms)."""
+        with self._lock:
+            rows = [(path, path.count(" > "), calls, total * 1000.0) for path, (calls, total) in self._paths.items()]
+        df = pd.DataFrame(rows, columns=["path", "depth", "calls", "total_ms"])
+        df["mean_ms"] = df["total_ms"] / df["calls"].clip(lower=1)
+        return df.sort_values("path", ignore_index=True)
+
+    def to_json(self):
+        return json.dumps(
+            {"functions": self.summary().to_dict("records"), "paths": self.paths().to_dict("records")}, indent=2
+        )
+
+
+@st.cache_resource
+def get_profiler():
+    """Process-wide profiler shared by every session."""
+    return LatencyProfiler()
+
+
+def profiled(func):
+    """Time `func` into the shared profiler when QF_PROFILE is set; otherwise return it untouched.
+
+    Goes under @fragment so fragment-only reruns are timed too.
+    """
+    if not PROFILE_ENABLED:
+        return func
+    name = func.__qualname__
+    profiler = get_profiler()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = profiler.stack()
+        frame = [name, 0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            path = " > ".join(f[0] for f in stack)
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            profiler.record(path, name, elapsed, elapsed - frame[1])
+
+    return wrapper
+
+
 # -----------------------------------------------------------------------------
 # Session State & Demo Data
 # -----------------------------------------------------------------------------
 
-AVAILABLE_TICKERS = [
+NAMED_TICKERS = [
     "NVDA",
     "AAPL",
     "MSFT",
@@ -155,6 +325,20 @@ AVAILABLE_TICKERS = [
 ]
 
 
+def synthetic_tickers(n: int):
+    """The first `n` synthetic QFxxxxx listings."""
+    return [f"QF{i:05d}" for i in range(1, n + 1)]
+
+
+# Synthetic QFxxxxx listings are padded onto the core names so the screener
+# can be exercised at realistic universe sizes (e.g. QF_UNIVERSE_SIZE=5000).
+# QF_CORE_SIZE does the same for the core itself (stored history, top picks,
+# watchlist candidates, social mentions), taking the first synthetic listings.
+UNIVERSE_SIZE = int(os.environ.get("QF_UNIVERSE_SIZE", "500"))
+CORE_SIZE = int(os.environ.get("QF_CORE_SIZE", str(len(NAMED_TICKERS))))
+AVAILABLE_TICKERS = NAMED_TICKERS + synthetic_tickers(CORE_SIZE - len(NAMED_TICKERS))
+
+
 def init_session_state():
     if "main_tab" not in st.session_state:
         st.session_state["main_tab"] = "HOME"
@@ -171,35 +355,34 @@ def init_session_state():
     if "time_horizon" not in st.session_state:
         st.session_state["time_horizon"] = "Month"  # Day | Week | Month | Year
 
-    # Portfolio data (demo)
-    if "portfolio" not in st.session_state:
-        st.session_state["portfolio"] = pd.DataFrame(
-            [
-                {
-                    "ticker": "NVDA",
-                    "name": "NVIDIA Corp.",
-                    "shares": 15,
-                    "buy_price": 120.0,
-                    "buy_date": "2024-03-01",
-                    "current_price": 180.0,
-                },
-                {
-                    "ticker": "AAPL",
-                    "name": "Apple Inc.",
-                    "shares": 30,
-                    "buy_price": 150.0,
-                    "buy_date": "2023-11-10",
-                    "current_price": 165.0,
-                },
-                {
-                    "ticker": "MSFT",
-                    "name": "Microsoft Corp.",
-                    "shares": 10,
-                    "buy_price": 320.0,
-                    "buy_date": "2024-01-20",
-                    "current_price": 400.0,
-                },
-            ]
+    # Portfolio data (demo); get_holdings_ledger() reprices the lots from stored closes.
+    if "ledger" not in st.session_state:
+        st.session_state["ledger"] = HoldingsLedger.from_frame(
+            pd.DataFrame(
+                [
+                    {
+                        "ticker": "NVDA",
+                        "shares": 15,
+                        "buy_price": 120.0,
+                        "buy_date": "2024-03-01",
+                        "current_price": 180.0,
+                    },
+                    {
+                        "ticker": "AAPL",
+                        "shares": 30,
+                        "buy_price": 150.0,
+                        "buy_date": "2023-11-10",
+                        "current_price": 165.0,
+                    },
+                    {
+                        "ticker": "MSFT",
+                        "shares": 10,
+                        "buy_price": 320.0,
+                        "buy_date": "2024-01-20",
+                        "current_price": 400.0,
+                    },
+                ]
+            )
         )
 
     if "watchlist" not in st.session_state:
@@ -217,6 +400,120 @@ def init_session_state():
         st.session_state["show_allocation_simulation"] = False
 
 
+# -----------------------------------------------------------------------------
+# Seeded Random Streams (no global NumPy RNG state)
+# -----------------------------------------------------------------------------
+
+def stable_seed(*key) -> int:
+    """64-bit seed from a stable hash of `key` (unlike hash(), fixed across processes)."""
+    digest = hashlib.blake2b("|".join(map(str, key)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def make_rng(*key):
+    """Independent Generator for one provider call, reproducible from its key."""
+    return np.random.default_rng(stable_seed(*key))
+
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64(x):
+    """SplitMix64 finalizer over a uint64 array (wrapping arithmetic)."""
+    # The first xor allocates the result; the remaining steps work on it in place.
+    x = x ^ (x >> np.uint64(30))
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return x
+
+
+def stable_seeds(tickers, *key):
+    """uint64 seed per ticker, hashing `key` and the ticker's own bytes only.
+
+    Vectorized counterpart of stable_seed(*key, ticker): the ticker bytes are
+    folded in 8-byte words, skipping the zero padding of shorter names, so a
+    ticker's seed does not depend on which batch it arrives in.
+    """
+    names = np.asarray([str(t) for t in tickers], dtype=np.bytes_)
+    width = max(-(-names.dtype.itemsize // 8) * 8, 8)
+    words = names.astype(f"S{width}").view("<u8").reshape(len(names), width // 8)
+    h = np.full(len(names), stable_seed(*key), dtype=np.uint64)
+    for word in words.T:
+        h = np.where(word != 0, _splitmix64((h ^ word) + _GOLDEN_GAMMA), h)
+    return h
+
+
+def counter_uniform(seeds, n: int, offset: int = 0):
+    """(len(seeds), n) uniforms in [0, 1): draw k of row i is a pure function of (seeds[i], offset + k)."""
+    counters = np.arange(offset + 1, offset + n + 1, dtype=np.uint64) * _GOLDEN_GAMMA
+    bits = _splitmix64(np.asarray(seeds, dtype=np.uint64)[:, None] + counters)
+    bits >>= np.uint64(11)
+    u = bits.astype(np.float64)
+    u *= 1.0 / (1 << 53)
+    return u
+
+
+def counter_normal(seeds, n: int, offset: int = 0):
+    """(len(seeds), n) standard normals via Box-Muller over counters offset+1 .. offset+2n.
+
+    Draw k uses counters offset+2k+1 and offset+2k+2 only, so a longer `n`
+    extends a row without changing the draws it already had.
+    """
+    u = counter_uniform(seeds, 2 * n, offset)
+    radius = np.log1p(-u[:, 0::2])
+    radius *= -2.0
+    np.sqrt(radius, out=radius)
+    angle = u[:, 1::2] * (2.0 * np.pi)
+    np.cos(angle, out=angle)
+    radius *= angle
+    return radius
+
+
+def _today_key() -> str:
+    return datetime.today().date().isoformat()
+
+
+# -----------------------------------------------------------------------------
+# Synthetic Series Engine (N tickers x T bars in one vectorized call)
+# -----------------------------------------------------------------------------
+
+def trailing_dates(n_bars: int, end=None):
+    """Daily date index of `n_bars` ending at `end` (defaults to today)."""
+    end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end)
+    return pd.date_range(end=end, periods=n_bars, freq="D")
+
+
+def simulate_price_matrix(seeds, n_bars: int, drift=0.0, vol=0.01, base=100.0):
+    """Compound one random-walk path per counter seed into an (N, T) price matrix.
+
+    The whole shock matrix comes from one counter_normal call. Row i depends
+    only on seeds[i], so a path never depends on which other series share the
+    batch, and a longer `n_bars` only appends bars. `drift` and `vol` broadcast
+    against the (N, T) shocks, so they can be scalars, per-ticker columns of
+    shape (N, 1) or per-bar rows of shape (T,). `base` is a scalar or one
+    starting price per row.
+    """
+    shocks = counter_normal(seeds, n_bars)
+    shocks *= np.asarray(vol, dtype=float)
+    shocks += np.asarray(drift, dtype=float)
+    np.add(shocks, 1.0, out=shocks)
+    np.cumprod(shocks, axis=1, out=shocks)
+    base = np.asarray(base, dtype=float)
+    if base.ndim:
+        base = base.reshape(-1, 1)
+    shocks *= base
+    return shocks
+
+
+def generate_series_matrix(seeds, n_bars: int, drift=0.0, vol=0.01, base=100.0, end=None):
+    """Shared date index plus (N, T) price matrix for a batch of series."""
+    dates = trailing_dates(n_bars, end=end)
+    prices = simulate_price_matrix(seeds, n_bars, drift=drift, vol=vol, base=base)
+    return dates, prices
+
+
 # -----------------------------------------------------------------------------
 # Demo Data Providers (to be replaced later with real data)
 # -----------------------------------------------------------------------------
@@ -241,110 +538,142 @@ def get_demo_global_market_snapshot():
     return indices
 
 
-def get_portfolio_timeseries():
-    dates = [datetime.today() - timedelta(days=i) for i in range(90)][::-1]
-    base = 10000
-    values = []
-    val = base
-    for _ in dates:
-        val = val * (1 + np.random.normal(0.0005, 0.01))
-        values.append(val)
-    return pd.DataFrame({"date": dates, "value": values})
-
+# Decision Engine: experts x tickers scored together, per-ticker calls wrap it.
 
-def compute_portfolio_from_state():
-    df = st.session_state["portfolio"].copy()
-    if df.empty:
-        return df, 0.0
-    df["unrealized_pl"] = (df["current_price"] - df["buy_price"]) * df["shares"]
-    df["unrealized_pl_pct"] = (df["current_price"] / df["buy_price"] - 1) * 100
-    total_value = (df["current_price"] * df["shares"]).sum()
-    df["weight_pct"] = df["current_price"] * df["shares"] / total_value * 100
-    return df, total_value
+EXPERT_NAMES = [
+    "Macro & Regime",
+    "Technical & Price Action",
+    "News & Sentiment",
+    "Risk & Stress",
+]
+# Demo prior (mean, std) of each expert's score, in EXPERT_NAMES order.
+EXPERT_SCORE_PRIORS = np.array(
+    [
+        [0.3, 0.3],
+        [0.4, 0.4],
+        [0.0, 0.5],
+        [-0.1, 0.4],
+    ]
+)
 
+RISK_PROFILE_LIMITS = {
+    "Conservative": {"base_alloc": 0.03, "stop_loss": 0.05, "take_profit": 0.10},
+    "Moderate": {"base_alloc": 0.06, "stop_loss": 0.07, "take_profit": 0.13},
+    "Aggressive": {"base_alloc": 0.10, "stop_loss": 0.09, "take_profit": 0.17},
+}
 
-def get_demo_expert_views(ticker: str, risk_profile: str, horizon: str):
-    base = sum(ord(c) for c in ticker)
-    np.random.seed(base)
+# Composite thresholds (strictly above) and the action each band maps to.
+DECISION_THRESHOLDS = np.array([-0.2, 0.05, 0.35])
+DECISION_ACTIONS = np.array(["AVOID", "TRIM", "HOLD", "BUY"])
+DECISION_CONVICTIONS = np.array(["High caution", "Cautious", "Balanced view", "Moderate conviction"])
 
-    def clip(x):
-        return float(np.clip(x, -1.0, 1.0))
 
-    views = {
-        "Macro & Regime": {
-            "score": clip(np.random.normal(0.3, 0.3)),
-            "bullets": [
-                "Market regime: risk-on, supportive for growth.",
-                "Sector showing strong relative strength.",
-            ],
-        },
-        "Technical & Price Action": {
-            "score": clip(np.random.normal(0.4, 0.4)),
-            "bullets": [
-                "Price above key moving averages.",
-                "Momentum still positive but monitored.",
-            ],
-        },
-        "News & Sentiment": {
-            "score": clip(np.random.normal(0.0, 0.5)),
-            "bullets": [
-                "Recent headlines skew mostly positive.",
-                "Social chatter broadly supportive.",
-            ],
-        },
-        "Risk & Stress": {
-            "score": clip(np.random.normal(-0.1, 0.4)),
-            "bullets": [
-                "Volatility slightly elevated vs long-term.",
-                f"Position size adapted to {risk_profile.lower()} profile.",
-            ],
-        },
+def _expert_bullets(risk_profile: str):
+    return {
+        "Macro & Regime": [
+            "Market regime: risk-on, supportive for growth.",
+            "Sector showing strong relative strength.",
+        ],
+        "Technical & Price Action": [
+            "Price above key moving averages.",
+            "Momentum still positive but monitored.",
+        ],
+        "News & Sentiment": [
+            "Recent headlines skew mostly positive.",
+            "Social chatter broadly supportive.",
+        ],
+        "Risk & Stress": [
+            "Volatility slightly elevated vs long-term.",
+            f"Position size adapted to {risk_profile.lower()} profile.",
+        ],
     }
-    return views
 
 
-def get_demo_decision(ticker: str, risk_profile: str, horizon: str):
-    views = get_demo_expert_views(ticker, risk_profile, horizon)
-    scores = [v["score"] for v in views.values()]
-    composite = float(np.mean(scores))
-
-    if composite > 0.35:
-        action = "BUY"
-        conviction = "Strong conviction" if composite > 0.65 else "Moderate conviction"
-    elif composite > 0.05:
-        action = "HOLD"
-        conviction = "Balanced view"
-    elif composite > -0.2:
-        action = "TRIM"
-        conviction = "Cautious"
+def get_demo_expert_scores_batch(tickers, risk_profile: str, horizon: str, rngs=None):
+    """Experts x tickers score matrix of shape (len(EXPERT_NAMES), len(tickers)).
+
+    Draws come from per-ticker counter seeds in one vectorized call; explicit
+    `rngs` (one Generator per ticker) are honoured for reproducible single calls.
+    """
+    n_experts = len(EXPERT_NAMES)
+    if rngs is None:
+        z = counter_normal(stable_seeds(tickers, "expert_views"), n_experts).T
     else:
-        action = "AVOID"
-        conviction = "High caution"
+        z = np.column_stack([rng.standard_normal(n_experts) for rng in rngs])
+    scores = EXPERT_SCORE_PRIORS[:, :1] + EXPERT_SCORE_PRIORS[:, 1:] * z
+    return np.clip(scores, -1.0, 1.0)
+
+
+def get_demo_decisions_batch(tickers, risk_profile: str, horizon: str):
+    """Score a whole universe at once.
 
-    base_alloc = {"Conservative": 0.03, "Moderate": 0.06, "Aggressive": 0.10}[risk_profile]
-    suggested_alloc = max(0.0, base_alloc * (0.6 + composite))
+    Returns a dict of arrays aligned with `tickers`: the experts x tickers
+    `scores` matrix plus per-ticker composite, action, conviction, allocation
+    and stop-loss/take-profit levels (all percentages).
+    """
+    tickers = list(tickers)
+    scores = get_demo_expert_scores_batch(tickers, risk_profile, horizon)
+    composite = scores.mean(axis=0)
 
-    stop_loss_pct = 0.05 if risk_profile == "Conservative" else 0.07 if risk_profile == "Moderate" else 0.09
-    take_profit_pct = 0.10 if risk_profile == "Conservative" else 0.13 if risk_profile == "Moderate" else 0.17
+    band = np.searchsorted(DECISION_THRESHOLDS, composite, side="left")
+    action = DECISION_ACTIONS[band]
+    conviction = DECISION_CONVICTIONS[band]
+    conviction = np.where((band == len(DECISION_THRESHOLDS)) & (composite > 0.65), "Strong conviction", conviction)
 
+    limits = RISK_PROFILE_LIMITS[risk_profile]
+    allocation = np.maximum(0.0, limits["base_alloc"] * (0.6 + composite))
+    n = len(tickers)
+
+    return {
+        "tickers": tickers,
+        "expert_names": EXPERT_NAMES,
+        "scores": scores,
+        "composite": composite,
+        "action": action,
+        "conviction": conviction,
+        "allocation_pct": allocation * 100,
+        "stop_loss_pct": np.full(n, limits["stop_loss"] * 100),
+        "take_profit_pct": np.full(n, limits["take_profit"] * 100),
+    }
+
+
+def decision_from_batch(batch, i: int, risk_profile: str):
+    """Per-ticker decision dict (the get_demo_decision shape) for row `i` of a batch."""
+    composite = float(batch["composite"][i])
+    bullets = _expert_bullets(risk_profile)
+    views = {
+        name: {"score": float(batch["scores"][k, i]), "bullets": bullets[name]}
+        for k, name in enumerate(batch["expert_names"])
+    }
     explanation = [
         f"Composite expert score: {composite:+.2f}.",
         "Macro, technical, news and risk experts aligned into a single view.",
         f"Position size and risk envelope tailored to your {risk_profile.lower()} profile.",
     ]
-
     return {
-        "action": action,
-        "conviction": conviction,
+        "action": str(batch["action"][i]),
+        "conviction": str(batch["conviction"][i]),
         "composite": composite,
-        "allocation_pct": suggested_alloc * 100,
-        "stop_loss_pct": stop_loss_pct * 100,
-        "take_profit_pct": take_profit_pct * 100,
+        "allocation_pct": float(batch["allocation_pct"][i]),
+        "stop_loss_pct": float(batch["stop_loss_pct"][i]),
+        "take_profit_pct": float(batch["take_profit_pct"][i]),
         "explanation": explanation,
         "expert_views": views,
     }
 
 
+def get_demo_expert_views(ticker: str, risk_profile: str, horizon: str, rng=None):
+    rngs = None if rng is None else [rng]
+    scores = get_demo_expert_scores_batch([ticker], risk_profile, horizon, rngs=rngs)[:, 0]
+    bullets = _expert_bullets(risk_profile)
+    return {name: {"score": float(score), "bullets": bullets[name]} for name, score in zip(EXPERT_NAMES, scores)}
+
+
+def get_demo_decision(ticker: str, risk_profile: str, horizon: str):
+    batch = get_demo_decisions_batch([ticker], risk_profile, horizon)
+    return decision_from_batch(batch, 0, risk_profile)
+
+
 def get_demo_news_feed():
     now = datetime.utcnow()
     return [
@@ -353,7 +682,6 @@ def get_demo_news_feed():
             "time": now - timedelta(minutes=40),
             "headline": "Chipmakers rally as AI demand remains strong",
             "summary": "Semiconductor stocks extend gains after upbeat AI server demand data.",
-            "sentiment": "Positive",
             "impact": "High",
             "tickers": ["NVDA", "AMD", "MSFT"],
             "insight": "Likely supportive for AI chip leaders; reinforces bullish view on NVDA.",
@@ -363,7 +691,6 @@ def get_demo_news_feed():
             "time": now - timedelta(hours=2),
             "headline": "Regulators weigh new rules on big tech data practices",
             "summary": "US and EU regulators outline potential new data rules for large platforms.",
-            "sentiment": "Negative",
             "impact": "Medium",
             "tickers": ["META", "GOOGL", "AAPL"],
             "insight": "Introduces headline risk; we stay selective in data-heavy names.",
@@ -373,7 +700,6 @@ def get_demo_news_feed():
             "time": now - timedelta(hours=3, minutes=30),
             "headline": "Bitcoin slides after brief run to new local highs",
             "summary": "Crypto markets pull back as traders take profits after a sharp rally.",
-            "sentiment": "Negative",
             "impact": "High",
             "tickers": ["BTC-USD", "ETH-USD"],
             "insight": "Short-term pressure after extended run-up; risk-sensitive profiles should size cautiously.",
@@ -381,14 +707,62 @@ def get_demo_news_feed():
     ]
 
 
-def get_demo_model_history(ticker: str):
+NEWS_SOURCES = ["Reuters", "Bloomberg", "CNBC", "Financial Times", "MarketWatch", "CoinDesk"]
+_NEWS_TEMPLATES = [
+    ("{name} shares climb after upbeat guidance", "Guidance reset supports our constructive view on {ticker}."),
+    ("{name} beats estimates as demand stays firm", "Earnings momentum is consistent with the model's positive tilt."),
+    ("Analysts trim targets on {name} amid margin pressure", "Margin risk argues for tighter sizing in {ticker}."),
+    ("{name} falls as regulators open inquiry", "Headline risk; we stay selective until scope is clearer."),
+    ("{name} trades flat ahead of investor day", "Little new information; positioning unchanged."),
+    (
+        "Options activity in {name} points to bigger moves",
+        "Implied volatility is rising; expect wider ranges in {ticker}.",
+    ),
+]
+
+
+def get_demo_news_stream(n_items: int, end=None, rng=None):
+    """Synthetic articles for the ingestion stream stand-in, oldest first, spread over the last week."""
+    end = datetime.utcnow() if end is None else end
+    rng = make_rng("news_stream", n_items, end.date().isoformat()) if rng is None else rng
+    master = get_demo_symbol_master(get_symbol_universe())
+    # Most coverage goes to the core names, the rest to the long tail.
+    core = rng.random(n_items) < 0.7
+    rows = np.where(core, rng.integers(len(AVAILABLE_TICKERS), size=n_items), rng.integers(len(master), size=n_items))
+    template = rng.integers(len(_NEWS_TEMPLATES), size=n_items)
+    source = rng.integers(len(NEWS_SOURCES), size=n_items)
+    age_min = np.sort(rng.uniform(0, 7 * 24 * 60, size=n_items))[::-1]
+    tickers = master["ticker"].to_numpy()[rows].tolist()
+    names = master["name"].to_numpy()[rows].tolist()
+    times = (np.datetime64(end, "us") - (age_min * 60e6).astype("timedelta64[us]")).tolist()
+    items = []
+    for i in range(n_items):
+        ticker, name = tickers[i], names[i]
+        headline, insight = _NEWS_TEMPLATES[template[i]]
+        items.append(
+            {
+                "source": NEWS_SOURCES[source[i]],
+                "time": times[i],
+                "headline": headline.format(name=name, ticker=ticker),
+                "summary": f"Demo wire item covering {name} ({ticker}).",
+                "impact": "Medium",
+                "tickers": [ticker],
+                "insight": insight.format(ticker=ticker),
+            }
+        )
+    return items
+
+
+@profiled
+def get_demo_model_history(ticker: str, rng=None):
     today = datetime.today().date()
+    rng = make_rng("model_history", ticker, today.isoformat()) if rng is None else rng
     rows = []
     for i in range(8):
         date = today - timedelta(days=(i * 7))
-        composite = np.random.normal(0.2, 0.5)
+        composite = rng.normal(0.2, 0.5)
         action = "BUY" if composite > 0.25 else "HOLD" if composite > -0.1 else "SELL"
-        realized = np.random.normal(0.01 if action == "BUY" else 0.0, 0.03)
+        realized = rng.normal(0.01 if action == "BUY" else 0.0, 0.03)
         rows.append(
             {
                 "date": date,
@@ -407,107 +781,2855 @@ def get_demo_model_history(ticker: str):
     return df
 
 
-def get_demo_sentiment_summary(ticker: str):
+VOLATILITY_LEVELS = np.array(["Low", "Medium", "High"])
+VOLATILITY_P = [0.3, 0.4, 0.3]
+VOLATILITY_CUMULATIVE_P = np.cumsum(VOLATILITY_P)[:-1]
+# Shown for symbols without measured volatility; never matched by a volatility filter.
+VOLATILITY_UNKNOWN = "n/a"
+
+
+@profiled
+def get_demo_quotes(tickers, rngs=None):
+    """Demo last price, daily % move and volatility label per ticker (arrays aligned with `tickers`)."""
+    if rngs is None:
+        seeds = stable_seeds(tickers, "quote", _today_key())
+        u = counter_uniform(seeds, 2)
+        price = 50 + 450 * u[:, 0]
+        daily_pct = 2 * counter_normal(seeds, 1, offset=2)[:, 0]
+        vol_level = np.searchsorted(VOLATILITY_CUMULATIVE_P, u[:, 1], side="right")
+    else:
+        price = np.array([rng.uniform(50, 500) for rng in rngs])
+        daily_pct = np.array([rng.normal(0, 2) for rng in rngs])
+        vol_level = np.array([rng.choice(3, p=VOLATILITY_P) for rng in rngs], dtype=int)
     return {
-        "score": 0.32,
-        "label": "Positive",
-        "text": "Recent coverage is skewed positive, driven by strong earnings and AI-related headlines.",
+        "tickers": list(tickers),
+        "price": price,
+        "daily_pct": daily_pct,
+        "volatility": VOLATILITY_LEVELS[vol_level],
     }
 
 
-def get_demo_price_and_forecast_series(ticker: str):
-    np.random.seed(sum(ord(c) for c in ticker) + 123)
-    days_back = 90
-    days_forward = 15
-
-    past_dates = [datetime.today() - timedelta(days=i) for i in range(days_back)][::-1]
-    price = 100.0
-    prices = []
-    for _ in past_dates:
-        price = price * (1 + np.random.normal(0.0008, 0.02))
-        prices.append(price)
-
-    future_dates = [datetime.today() + timedelta(days=i) for i in range(1, days_forward + 1)]
-    future_center = []
-    future_low = []
-    future_high = []
-    last_price = prices[-1]
-    fc_price = last_price
-    for _ in future_dates:
-        fc_price = fc_price * (1 + np.random.normal(0.001, 0.015))
-        future_center.append(fc_price)
-        band = fc_price * 0.03
-        future_low.append(fc_price - band)
-        future_high.append(fc_price + band)
-
-    return (
-        pd.DataFrame({"date": past_dates, "price": prices}),
+@profiled
+def get_demo_forecast_band(ticker: str, last_price: float, days_forward: int = 15):
+    """Demo model forecast continuing from `last_price`: center path with a ±3% band."""
+    dates, paths = generate_series_matrix(
+        stable_seeds([ticker], "forecast", _today_key()),
+        days_forward,
+        drift=0.001,
+        vol=0.015,
+        base=last_price,
+        end=pd.Timestamp.today().normalize() + pd.Timedelta(days=days_forward),
+    )
+    center = paths[0]
+    band = center * 0.03
+    return pd.DataFrame({"date": dates, "center": center, "low": center - band, "high": center + band})
+
+
+def _index_base_value(name: str) -> float:
+    return 1000.0 if "S&P" in name else 1500.0 if "Nasdaq" in name else 30000.0
+
+
+# First demo bar; QF_HISTORY_START shortens or lengthens every symbol's history.
+HISTORY_EPOCH = pd.Timestamp(os.environ.get("QF_HISTORY_START", "2018-01-01"))
+OHLCV_FIELDS = ["open", "high", "low", "close", "volume"]
+
+
+def _history_base_prices(symbols):
+    base = 20 + 280 * counter_uniform(stable_seeds(symbols, "ohlcv_base"), 1)[:, 0]
+    for i, symbol in enumerate(symbols):
+        if symbol in ("S&P 500", "Nasdaq 100", "BTC-USD"):
+            base[i] = _index_base_value(symbol)
+    return base
+
+
+def get_demo_ohlcv_histories(symbols, start=None, end=None):
+    """Demo daily OHLCV bars for a batch of symbols on a fixed calendar starting at HISTORY_EPOCH.
+
+    Each field is one (N, T) counter draw keyed by the symbol, so a symbol's
+    bars do not depend on the rest of the batch and existing bars never change
+    as `end` moves forward; later calls only add new bars. Returns one
+    DataFrame per symbol.
+    """
+    symbols = list(symbols)
+    end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end).normalize()
+    start = HISTORY_EPOCH if start is None else max(pd.Timestamp(start).normalize(), HISTORY_EPOCH)
+    if end < start or not symbols:
+        return [pd.DataFrame(columns=["date"] + OHLCV_FIELDS) for _ in symbols]
+
+    n_bars = (end - HISTORY_EPOCH).days + 1
+    base = _history_base_prices(symbols)
+    close = simulate_price_matrix(stable_seeds(symbols, "ohlcv_close"), n_bars, drift=0.0003, vol=0.018, base=base)
+    open_ = np.concatenate([base[:, None], close[:, :-1]], axis=1)
+    wick = np.abs(counter_normal(stable_seeds(symbols, "ohlcv_range"), 2 * n_bars)).reshape(len(symbols), n_bars, 2)
+    wick *= 0.006
+    volume = 1e6 * np.exp(0.35 * counter_normal(stable_seeds(symbols, "ohlcv_volume"), n_bars))
+    high = np.maximum(open_, close) * (1 + wick[:, :, 0])
+    low = np.minimum(open_, close) * (1 - wick[:, :, 1])
+
+    first = (start - HISTORY_EPOCH).days
+    dates = pd.date_range(HISTORY_EPOCH, periods=n_bars, freq="D")[first:]
+    return [
         pd.DataFrame(
             {
-                "date": future_dates,
-                "center": future_center,
-                "low": future_low,
-                "high": future_high,
+                "date": dates,
+                "open": open_[i, first:],
+                "high": high[i, first:],
+                "low": low[i, first:],
+                "close": close[i, first:],
+                "volume": volume[i, first:],
             }
-        ),
-    )
+        )
+        for i in range(len(symbols))
+    ]
 
 
-def get_demo_index_series(name: str):
-    """Demo index timeseries for MARKETS charts."""
-    np.random.seed(sum(ord(c) for c in name) + 999)
-    days_back = 60
-    dates = [datetime.today() - timedelta(days=i) for i in range(days_back)][::-1]
-    base = 1000 if "S&P" in name else 1500 if "Nasdaq" in name else 30000
-    vals = []
-    val = base
-    for _ in dates:
-        val = val * (1 + np.random.normal(0.0006, 0.012))
-        vals.append(val)
-    return pd.DataFrame({"date": dates, "value": vals})
+def get_demo_ohlcv_history(symbol: str, start=None, end=None):
+    """Demo daily OHLCV bars for one symbol (see get_demo_ohlcv_histories)."""
+    return get_demo_ohlcv_histories([symbol], start=start, end=end)[0]
 
 
 def get_demo_social_signals():
-    """Demo social signals for NEWS right-hand side."""
-    return {
-        "aggregate": {
-            "score": 0.18,
-            "label": "Mildly Positive",
-            "text": "Today’s social chatter is modestly positive, concentrated around AI, chips and crypto.",
-            "historical": "In similar past clusters, 1D volatility increased by ~2.1% on average for the most-mentioned tickers.",
+    """Demo X / Reddit posts, newest first."""
+    now = datetime.utcnow()
+    return [
+        {
+            "source": "X",
+            "handle": "@AI_Investor",
+            "time": now - timedelta(hours=1),
+            "ticker": "NVDA",
+            "text": "Still crazy how every major AI build-out touches NVIDIA somewhere.",
         },
-        "items": [
-            {
-                "source": "X",
-                "handle": "@AI_Investor",
-                "time": "1h ago",
-                "ticker": "NVDA",
-                "sentiment": "Positive",
-                "text": "Still crazy how every major AI build-out touches NVIDIA somewhere.",
-                "pattern": "Strong AI tweet clusters have historically coincided with short bursts of upside volatility.",
-            },
-            {
-                "source": "Reddit",
-                "handle": "r/stocks",
-                "time": "3h ago",
-                "ticker": "TSLA",
-                "sentiment": "Mixed",
-                "text": "Debate: is TSLA still a growth stock or just a car company multiple?",
-                "pattern": "Mixed sentiment waves often precede choppy sideways action.",
-            },
+        {
+            "source": "Reddit",
+            "handle": "r/stocks",
+            "time": now - timedelta(hours=3),
+            "ticker": "TSLA",
+            "text": "Debate: is TSLA still a growth stock or just a car company multiple?",
+        },
+        {
+            "source": "X",
+            "handle": "@CryptoMacro",
+            "time": now - timedelta(hours=5),
+            "ticker": "BTC-USD",
+            "text": "Funding rates overheating again; cautious on BTC at these levels.",
+        },
+    ]
+
+
+_SOCIAL_HANDLES = [
+    ("X", "@AI_Investor"),
+    ("X", "@CryptoMacro"),
+    ("X", "@ChartWhisperer"),
+    ("X", "@ValueHawk"),
+    ("Reddit", "r/stocks"),
+    ("Reddit", "r/investing"),
+    ("Reddit", "r/wallstreetbets"),
+    ("Reddit", "r/CryptoCurrency"),
+]
+_SOCIAL_TEMPLATES = [
+    "{ticker} looking strong into the close, buyers stepping up.",
+    "Loading more {ticker} here, this rally has legs.",
+    "{ticker} breakout confirmed? Volume says yes.",
+    "Anyone else cautious on {ticker} at these levels?",
+    "{ticker} feels overheating, taking profits.",
+    "Weak price action in {ticker} today, not a great sign.",
+    "Holding {ticker}, no changes to my plan.",
+    "What is everyone's take on {ticker} this week?",
+]
+
+
+def get_demo_social_stream(n_posts: int, end=None, rng=None):
+    """Synthetic posts for the social replay file, oldest first, over the last week.
+
+    Mentions lean towards the core names, and the final hour carries a
+    burst on one of them so burst detection has something to find.
+    """
+    end = datetime.utcnow() if end is None else end
+    rng = make_rng("social_stream", n_posts, end.date().isoformat()) if rng is None else rng
+    tickers = np.array(AVAILABLE_TICKERS)
+    weights = np.linspace(2.0, 1.0, len(tickers))
+    picks = rng.choice(len(tickers), size=n_posts, p=weights / weights.sum())
+    age_min = rng.uniform(0, 7 * 24 * 60, size=n_posts)
+    n_burst = n_posts // 50
+    picks[:n_burst] = rng.integers(len(tickers))
+    age_min[:n_burst] = rng.uniform(0, 60, size=n_burst)
+    order = np.argsort(-age_min)
+    times = (np.datetime64(end, "us") - (age_min[order] * 60e6).astype("timedelta64[us]")).tolist()
+    handles = rng.integers(len(_SOCIAL_HANDLES), size=n_posts)
+    templates = rng.integers(len(_SOCIAL_TEMPLATES), size=n_posts)
+    posts = []
+    for k, i in enumerate(order):
+        source, handle = _SOCIAL_HANDLES[handles[i]]
+        ticker = str(tickers[picks[i]])
+        posts.append(
             {
-                "source": "X",
-                "handle": "@CryptoMacro",
-                "time": "5h ago",
-                "ticker": "BTC-USD",
-                "sentiment": "Negative",
-                "text": "Funding rates overheating again; cautious on BTC at these levels.",
-                "pattern": "Similar caution clusters historically aligned with short-term pullbacks.",
-            },
-        ],
+                "source": source,
+                "handle": handle,
+                "time": times[k],
+                "ticker": ticker,
+                "text": _SOCIAL_TEMPLATES[templates[i]].format(ticker=ticker),
+            }
+        )
+    return posts
+
+
+COMPANY_NAMES = {
+    "NVDA": "NVIDIA Corp.",
+    "AAPL": "Apple Inc.",
+    "MSFT": "Microsoft Corp.",
+    "GOOGL": "Alphabet Inc.",
+    "META": "Meta Platforms Inc.",
+    "TSLA": "Tesla Inc.",
+    "AMZN": "Amazon.com Inc.",
+    "BTC-USD": "Bitcoin",
+    "ETH-USD": "Ethereum",
+}
+_NAME_STEMS = np.array(
+    "Apex Aurora Beacon Cedar Crest Delta Ember Falcon Granite Harbor Helix Iron Juniper "
+    "Keystone Lumen Maple Nova Orbit Pioneer Quantum Ridge Summit Terra Vertex Willow".split()
+)
+_NAME_SECTORS = np.array(
+    "Systems Holdings Energy Therapeutics Networks Robotics Foods Capital Semiconductor "
+    "Logistics Materials Software Biotech Retail Motors".split()
+)
+_NAME_SUFFIXES = np.array(["Inc.", "Corp.", "Group", "Ltd."])
+
+
+def get_demo_symbol_master(symbols):
+    """Symbol master (ticker, name) for `symbols`; unknown tickers get generated company names."""
+    rng = make_rng("symbol_master")
+    n = len(symbols)
+    generated = (
+        pd.Series(_NAME_STEMS[rng.integers(len(_NAME_STEMS), size=n)])
+        + " "
+        + _NAME_SECTORS[rng.integers(len(_NAME_SECTORS), size=n)]
+        + " "
+        + _NAME_SUFFIXES[rng.integers(len(_NAME_SUFFIXES), size=n)]
+    )
+    names = [COMPANY_NAMES.get(t, generated[i]) for i, t in enumerate(symbols)]
+    return pd.DataFrame({"ticker": list(symbols), "name": names})
+
+
+# -----------------------------------------------------------------------------
+# Market Data Providers (demo backend + on-disk columnar history cache)
+# -----------------------------------------------------------------------------
+
+DATA_CACHE_DIR = os.environ.get(
+    "QF_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".qf_cache"),
+)
+HISTORY_COMPACT_PARTS = 16
+HISTORY_FRAME_TTL_SECONDS = 6 * 3600.0
+# Fixed pool of locks shared by symbols (by hash), instead of one lock per symbol ever seen.
+HISTORY_LOCK_STRIPES = 64
+# Symbols per vectorized demo history draw; bounds the (N, T) working set of a cold store build.
+HISTORY_BATCH_SYMBOLS = 128
+
+
+class MarketDataProvider(abc.ABC):
+    """Interface every market-data backend implements."""
+
+    @abc.abstractmethod
+    def snapshot(self):
+        """Global market snapshot as a list of {"label", "price", "pct"} dicts."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def history(self, symbol: str, start=None, end=None):
+        """Daily bars for `symbol` between `start` and `end` (inclusive).
+
+        Returns a DataFrame with a "date" column followed by OHLCV_FIELDS,
+        sorted by date. `end` defaults to today.
+        """
+        raise NotImplementedError
+
+    def histories(self, symbols, start=None, end=None):
+        """history() for each of `symbols`, as a list aligned with them.
+
+        Backends that can fetch a batch in one call override this.
+        """
+        return [self.history(symbol, start=start, end=end) for symbol in symbols]
+
+    @abc.abstractmethod
+    def news(self):
+        """News feed items (see get_demo_news_feed for the shape)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def social(self):
+        """Recent social posts, newest first (see get_demo_social_signals for the shape)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def symbol_master(self):
+        """Every listed instrument as a DataFrame with "ticker" and "name" columns."""
+        raise NotImplementedError
+
+
+class DemoMarketDataProvider(MarketDataProvider):
+    """Default backend built on the get_demo_* generators."""
+
+    @profiled
+    def snapshot(self):
+        return get_demo_global_market_snapshot()
+
+    @profiled
+    def history(self, symbol: str, start=None, end=None):
+        return get_demo_ohlcv_history(symbol, start=start, end=end)
+
+    @profiled
+    def histories(self, symbols, start=None, end=None):
+        symbols = list(symbols)
+        frames = []
+        for lo in range(0, len(symbols), HISTORY_BATCH_SYMBOLS):
+            frames += get_demo_ohlcv_histories(symbols[lo : lo + HISTORY_BATCH_SYMBOLS], start=start, end=end)
+        return frames
+
+    @profiled
+    def news(self):
+        return get_demo_news_feed()
+
+    @profiled
+    def social(self):
+        return get_demo_social_signals()
+
+    @profiled
+    def symbol_master(self):
+        return get_demo_symbol_master(get_symbol_universe())
+
+
+class CachedMarketDataProvider(MarketDataProvider):
+    """Local columnar history cache in front of another provider.
+
+    Each symbol's bars live in a Parquet dataset under
+    `<cache_dir>/history/<symbol>/`. A warm start reads history from there
+    without calling the inner provider. When a request reaches past the
+    cached range, only the missing bars are fetched and they are written as
+    a new part file. Parts are compacted into one once there are more than
+    HISTORY_COMPACT_PARTS.
+    """
+
+    def __init__(self, inner: MarketDataProvider, cache_dir: str = DATA_CACHE_DIR):
+        self.inner = inner
+        self.cache_dir = cache_dir
+        # Parsed frames live in the shared, memory-budgeted tier; an evicted
+        # frame is simply read back from its Parquet parts.
+        self.frames = CacheNamespace(get_shared_cache(), "history_frames", HISTORY_FRAME_TTL_SECONDS)
+        self._locks = [threading.Lock() for _ in range(HISTORY_LOCK_STRIPES)]
+
+    @profiled
+    def snapshot(self):
+        return self.inner.snapshot()
+
+    @profiled
+    def news(self):
+        return self.inner.news()
+
+    @profiled
+    def social(self):
+        return self.inner.social()
+
+    @profiled
+    def symbol_master(self):
+        return self.inner.symbol_master()
+
+    def _symbol_lock(self, symbol: str):
+        return self._locks[stable_seed(symbol) % HISTORY_LOCK_STRIPES]
+
+    def _symbol_dir(self, symbol: str):
+        return os.path.join(self.cache_dir, "history", re.sub(r"[^A-Za-z0-9._-]", "_", symbol))
+
+    def _parts(self, symbol: str):
+        return sorted(glob.glob(os.path.join(self._symbol_dir(symbol), "part-*.parquet")))
+
+    def _read(self, symbol: str):
+        parts = self._parts(symbol)
+        if not parts:
+            return None
+        return _merge_bars([pd.read_parquet(path) for path in parts])
+
+    def _write_part(self, symbol: str, bars, name: str):
+        folder = self._symbol_dir(symbol)
+        os.makedirs(folder, exist_ok=True)
+        tmp = os.path.join(folder, f".{name}.tmp")
+        bars.to_parquet(tmp, index=False)
+        os.replace(tmp, os.path.join(folder, name))
+
+    def _append(self, symbol: str, bars, merged):
+        first, last = bars["date"].iloc[0], bars["date"].iloc[-1]
+        self._write_part(symbol, bars, f"part-{first:%Y%m%d}-{last:%Y%m%d}.parquet")
+        parts = self._parts(symbol)
+        if len(parts) > HISTORY_COMPACT_PARTS:
+            first, last = merged["date"].iloc[0], merged["date"].iloc[-1]
+            name = f"part-{first:%Y%m%d}-{last:%Y%m%d}.parquet"
+            self._write_part(symbol, merged, name)
+            for path in parts:
+                if os.path.basename(path) != name:
+                    os.remove(path)
+
+    @profiled
+    def history(self, symbol: str, start=None, end=None):
+        end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end).normalize()
+        start = None if start is None else pd.Timestamp(start).normalize()
+        one_day = pd.Timedelta(days=1)
+
+        with self._symbol_lock(symbol):
+            df = cached = self.frames.get(symbol)
+            if df is None:
+                df = self._read(symbol)
+
+            if df is None or df.empty:
+                missing = [(start, end)]
+            else:
+                missing = []
+                if start is not None and start < df["date"].iloc[0]:
+                    missing.append((start, df["date"].iloc[0] - one_day))
+                if end > df["date"].iloc[-1]:
+                    missing.append((df["date"].iloc[-1] + one_day, end))
+
+            fetched = [self.inner.history(symbol, start=a, end=b) for a, b in missing]
+            fetched = [bars for bars in fetched if len(bars)]
+            if fetched:
+                df = _merge_bars(([] if df is None else [df]) + fetched)
+                for bars in fetched:
+                    self._append(symbol, bars, df)
+            if df is None:
+                df = pd.DataFrame(columns=["date"] + OHLCV_FIELDS)
+            if df is not cached:
+                self.frames.set(symbol, df)
+
+        mask = df["date"] <= end
+        if start is not None:
+            mask &= df["date"] >= start
+        return df.loc[mask].reset_index(drop=True)
+
+    @profiled
+    def histories(self, symbols, start=None, end=None):
+        # Symbols with nothing cached are fetched from the inner provider in one batch;
+        # the rest at most need their missing edges, which history() fetches per symbol.
+        cold = [
+            symbol
+            for symbol in dict.fromkeys(symbols)
+            if self.frames.get(symbol) is None and not self._parts(symbol)
+        ]
+        if cold:
+            end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end).normalize()
+            for symbol, bars in zip(cold, self.inner.histories(cold, start=start, end=end)):
+                with self._symbol_lock(symbol):
+                    if len(bars) and self.frames.get(symbol) is None and not self._parts(symbol):
+                        self._append(symbol, bars, bars)
+                        self.frames.set(symbol, bars)
+        return [self.history(symbol, start=start, end=end) for symbol in symbols]
+
+
+def _merge_bars(frames):
+    df = pd.concat(frames, ignore_index=True)
+    return df.drop_duplicates("date", keep="last").sort_values("date").reset_index(drop=True)
+
+
+def parse_named_spec(spec: str, scale: float = 1.0):
+    """"news=400,social=150,*=50" (or a bare "120" for everything) -> {name: value * scale}."""
+    values = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.rpartition("=")
+        values[name or "*"] = float(value) * scale
+    return values
+
+
+# Stand-in latency for exercising concurrent loading without real backends,
+# keyed by provider method or loader task name, in milliseconds.
+INJECTED_LATENCY = parse_named_spec(os.environ.get("QF_INJECT_LATENCY_MS", ""), scale=1e-3)
+
+
+def inject_latency(name: str):
+    delay = INJECTED_LATENCY.get(name, INJECTED_LATENCY.get("*", 0.0))
+    if delay:
+        time.sleep(delay)
+
+
+class LatencyInjectingProvider(MarketDataProvider):
+    """Wraps a provider and sleeps before each call, standing in for network I/O."""
+
+    def __init__(self, inner: MarketDataProvider):
+        self.inner = inner
+
+    def snapshot(self):
+        inject_latency("snapshot")
+        return self.inner.snapshot()
+
+    def history(self, symbol: str, start=None, end=None):
+        inject_latency("history")
+        return self.inner.history(symbol, start=start, end=end)
+
+    def histories(self, symbols, start=None, end=None):
+        inject_latency("history")
+        return self.inner.histories(symbols, start=start, end=end)
+
+    def news(self):
+        inject_latency("news")
+        return self.inner.news()
+
+    def social(self):
+        inject_latency("social")
+        return self.inner.social()
+
+    def symbol_master(self):
+        inject_latency("symbol_master")
+        return self.inner.symbol_master()
+
+
+@st.cache_resource
+def get_market_data_provider():
+    """Process-wide provider: the demo backend behind the on-disk history cache."""
+    inner = DemoMarketDataProvider()
+    if INJECTED_LATENCY:
+        inner = LatencyInjectingProvider(inner)
+    return CachedMarketDataProvider(inner, DATA_CACHE_DIR)
+
+
+# -----------------------------------------------------------------------------
+# Memory-mapped Price History Store (one physical copy for all sessions)
+# -----------------------------------------------------------------------------
+
+HISTORY_SYMBOLS = AVAILABLE_TICKERS + ["S&P 500", "Nasdaq 100"]
+
+
+class PriceHistoryStore:
+    """Array-backed daily history opened with np.load(mmap_mode="r").
+
+    On disk, one directory per build holds `timestamps.npy` (int64 ns,
+    shape (T,)), one contiguous float64 `<field>.npy` block of shape (N, T)
+    per OHLCV field, and `symbols.json` with the row order. Every session
+    maps the same files, so history is resident once per machine. window()
+    returns views into the mapping, not copies.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "symbols.json")) as f:
+            self.symbols = json.load(f)
+        self._rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.timestamps = np.load(os.path.join(path, "timestamps.npy"), mmap_mode="r")
+        self.dates = self.timestamps.view("datetime64[ns]")
+        self.fields = {
+            field: np.load(os.path.join(path, f"{field}.npy"), mmap_mode="r") for field in OHLCV_FIELDS
+        }
+
+    @classmethod
+    def build(cls, provider: MarketDataProvider, symbols, path: str, end=None):
+        """Write a store for `symbols` from `provider` history up to `end`, then open it."""
+        frames = provider.histories(symbols, end=end)
+        dates = pd.DatetimeIndex(sorted(set().union(*(df["date"] for df in frames))))
+        tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(tmp, exist_ok=True)
+
+        np.save(os.path.join(tmp, "timestamps.npy"), dates.as_unit("ns").asi8)
+        for field in OHLCV_FIELDS:
+            block = np.lib.format.open_memmap(
+                os.path.join(tmp, f"{field}.npy"), mode="w+", dtype=np.float64, shape=(len(symbols), len(dates))
+            )
+            block[:] = np.nan
+            for i, df in enumerate(frames):
+                block[i, dates.get_indexer(df["date"])] = df[field].to_numpy(dtype=np.float64)
+            block.flush()
+            del block
+        with open(os.path.join(tmp, "symbols.json"), "w") as f:
+            json.dump(list(symbols), f)
+
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # Another session or process published this build first.
+            shutil.rmtree(tmp, ignore_errors=True)
+        return cls(path)
+
+    def __contains__(self, symbol: str):
+        return symbol in self._rows
+
+    def window(self, symbol: str, field: str = "close", start=None, end=None):
+        """Zero-copy (dates, values) views of one symbol's bars within [start, end]."""
+        row = self.fields[field][self._rows[symbol]]
+        lo = 0 if start is None else np.searchsorted(self.timestamps, pd.Timestamp(start).value, side="left")
+        hi = (
+            len(self.timestamps)
+            if end is None
+            else np.searchsorted(self.timestamps, pd.Timestamp(end).value, side="right")
+        )
+        return self.dates[lo:hi], row[lo:hi]
+
+    def rows(self, symbols):
+        """Row index of each symbol, for fancy-indexing several symbols at once."""
+        return np.array([self._rows[symbol] for symbol in symbols], dtype=np.int64)
+
+    def trailing(self, symbol: str, n_bars: int, field: str = "close"):
+        """Zero-copy (dates, values) views of the last `n_bars` bars."""
+        row = self.fields[field][self._rows[symbol]]
+        return self.dates[-n_bars:], row[-n_bars:]
+
+
+def aligned_closes(store: PriceHistoryStore, symbols, lo: int = 0):
+    """(len(symbols), bars) close matrix on the store's dates from bar `lo` onward.
+
+    Stored symbols are sliced from the mapping. Others (long-tail holdings)
+    are read from the provider's cached bars and aligned to the same dates.
+    Bars a symbol does not have, including every bar of a symbol the provider
+    cannot serve, stay NaN, so callers can leave out one symbol at a time.
+    """
+    symbols = list(symbols)
+    dates = pd.DatetimeIndex(store.dates[lo:])
+    closes = np.full((len(symbols), len(dates)), np.nan)
+    stored = [i for i, symbol in enumerate(symbols) if symbol in store]
+    if stored:
+        closes[stored] = store.fields["close"][store.rows([symbols[i] for i in stored]), lo:]
+    if len(dates) and len(stored) < len(symbols):
+        provider = get_market_data_provider()
+        for i in sorted(set(range(len(symbols))) - set(stored)):
+            try:
+                bars = provider.history(symbols[i], start=dates[0], end=dates[-1])
+            except Exception:
+                continue
+            pos = dates.get_indexer(bars["date"])
+            found = pos >= 0
+            closes[i, pos[found]] = bars["close"].to_numpy(dtype=np.float64)[found]
+    return closes
+
+
+@st.cache_resource(max_entries=1)
+def _open_price_history_store(day: str):
+    root = os.path.join(DATA_CACHE_DIR, "store")
+    path = os.path.join(root, day)
+    if not os.path.exists(os.path.join(path, "symbols.json")):
+        PriceHistoryStore.build(get_market_data_provider(), HISTORY_SYMBOLS, path, end=day)
+    # The previous day's store stays on disk: the refresh scheduler keeps
+    # serving its memmaps until this one is published. Older days are no
+    # longer cached or served, so nothing maps them any more.
+    previous = sorted({name[:10] for name in os.listdir(root) if name[:10] < day})[-1:]
+    for old in glob.glob(os.path.join(root, "*")):
+        name = os.path.basename(old)
+        if name[:10] < day and name[:10] not in previous:
+            shutil.rmtree(old, ignore_errors=True)
+    # Decisions scored against the previous day's data are stale from here on.
+    invalidate_decision_cache()
+    return PriceHistoryStore(path)
+
+
+def get_price_history_store():
+    """Today's shared history store, built once per day from the provider's cache.
+
+    Served by the refresh scheduler, so after midnight readers keep yesterday's
+    store until the new one has been built in the background.
+    """
+    return get_refresh_scheduler().read("price_history")
+
+
+# -----------------------------------------------------------------------------
+# Process-wide Caches (shared by every session)
+# -----------------------------------------------------------------------------
+
+DECISION_CACHE_TTL_SECONDS = 300.0
+# Every decision dict has the same shape; estimate_nbytes puts key + value at ~4.4 KB.
+DECISION_ENTRY_NBYTES = 4608
+# One memory budget for every shared cache below (QF_CACHE_BUDGET_MB).
+SHARED_CACHE_BUDGET_BYTES = int(float(os.environ.get("QF_CACHE_BUDGET_MB", "512")) * 1024**2)
+SHARED_CACHE_MAX_ENTRIES = 2_000_000
+# How often an over-budget cache may sweep for expired entries before evicting live ones.
+CACHE_PURGE_INTERVAL_SECONDS = 30.0
+
+
+def estimate_nbytes(value):
+    """Rough in-memory size of a cached value; arrays and frames count their buffers."""
+    # Scalars first: most entries are small, and isinstance against go.Figure is slow.
+    if value is None or isinstance(value, (str, bytes, int, float)):
+        return sys.getsizeof(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, go.Figure):
+        # A FrozenFigure hands back its captured spec here rather than a fresh copy.
+        return estimate_nbytes(value.to_dict())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTLs, an optional byte budget and hit/miss counters.
+
+    With `max_bytes`, each entry is sized by `sizeof(key) + sizeof(value)`
+    when stored. Once over either limit, expired entries are swept first (at
+    most every CACHE_PURGE_INTERVAL_SECONDS), then least recently used ones
+    are evicted until the cache fits. A value bigger than the whole budget
+    is not stored at all.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0, max_bytes=None, sizeof=estimate_nbytes):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._drop(key)
+                    self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None, nbytes=None):
+        """Store `value` for `ttl` seconds (the cache's default TTL if None).
+
+        `nbytes` is the entry's size when the caller already knows it; only
+        otherwise is the entry measured with `sizeof`.
+        """
+        now = time.monotonic()
+        expires = now + (self.ttl_seconds if ttl is None else ttl)
+        if self.max_bytes is None:
+            nbytes = 0
+        elif nbytes is None:
+            nbytes = self.sizeof(key) + self.sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                self.rejections += 1
+                return
+            self._data[key] = (expires, value, nbytes)
+            self.nbytes += nbytes
+            if self._over_limit() and now >= self._next_purge:
+                self._next_purge = now + CACHE_PURGE_INTERVAL_SECONDS
+                for stale in [k for k, entry in self._data.items() if entry[0] <= now]:
+                    self._drop(stale)
+                    self.expirations += 1
+            while self._over_limit():
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def _over_limit(self):
+        return len(self._data) > self.max_entries or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+
+    def _drop(self, key):
+        self.nbytes -= self._data.pop(key)[2]
+
+    def invalidate(self, predicate=None):
+        """Drop every entry, or only those whose key satisfies `predicate`."""
+        with self._lock:
+            if predicate is None:
+                self._data.clear()
+                self.nbytes = 0
+            else:
+                for key in [k for k in self._data if predicate(k)]:
+                    self._drop(key)
+
+    def discard(self, keys):
+        """Drop the given keys where present (no scan, unlike invalidate)."""
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._drop(key)
+
+    def usage(self, predicate):
+        """(entries, bytes) held under keys satisfying `predicate`."""
+        with self._lock:
+            sizes = [entry[2] for key, entry in self._data.items() if predicate(key)]
+        return len(sizes), sum(sizes)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "rejections": self.rejections,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class CacheNamespace:
+    """One consumer's slice of a shared TTLCache: its own key space, default TTL and counters.
+
+    Namespaces compete for the tier's single memory budget, so a burst of
+    figures can push out old sentiment scores and vice versa, oldest first.
+    `sizeof` sizes each entry: None walks it with the tier's sizeof (for
+    values of unknown shape), a callable is applied to the value, and an int
+    is a fixed per-entry estimate for values that all look alike.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, tier: TTLCache, name: str, ttl_seconds: float, sizeof=None):
+        self.tier = tier
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        value = self.tier.get((self.name, key), self._MISSING)
+        if value is self._MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        nbytes = self.sizeof(value) if callable(self.sizeof) else self.sizeof
+        self.tier.set((self.name, key), value, ttl=self.ttl_seconds if ttl is None else ttl, nbytes=nbytes)
+
+    def discard(self, keys):
+        self.tier.discard((self.name, key) for key in keys)
+
+    def invalidate(self, predicate=None):
+        name = self.name
+        self.tier.invalidate(lambda key: key[0] == name and (predicate is None or predicate(key[1])))
+
+    def stats(self):
+        size, nbytes = self.tier.usage(lambda key: key[0] == self.name)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "bytes": nbytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+@st.cache_resource
+def get_shared_cache():
+    """The process-wide cache tier behind every namespace, bounded by SHARED_CACHE_BUDGET_BYTES."""
+    return TTLCache(max_entries=SHARED_CACHE_MAX_ENTRIES, max_bytes=SHARED_CACHE_BUDGET_BYTES)
+
+
+@st.cache_resource
+def get_decision_cache():
+    """Decision cache keyed by (ticker, risk_profile, horizon), shared across sessions."""
+    return CacheNamespace(
+        get_shared_cache(), "decisions", DECISION_CACHE_TTL_SECONDS, sizeof=DECISION_ENTRY_NBYTES
+    )
+
+
+def invalidate_decision_cache(tickers=None, risk_profile: str = None, horizon: str = None):
+    """Forget cached decisions after their inputs refresh (all tickers by default).
+
+    With `tickers`, `risk_profile` and `horizon` all given, exactly those keys
+    are dropped; otherwise every matching key is found by a scan.
+    """
+    cache = get_decision_cache()
+    if tickers is not None and risk_profile is not None and horizon is not None:
+        cache.discard((t, risk_profile, horizon) for t in tickers)
+    elif tickers is None and risk_profile is None and horizon is None:
+        cache.invalidate()
+    else:
+        tickers = None if tickers is None else set(tickers)
+        cache.invalidate(
+            lambda key: (tickers is None or key[0] in tickers)
+            and (risk_profile is None or key[1] == risk_profile)
+            and (horizon is None or key[2] == horizon)
+        )
+
+
+@profiled
+def get_cached_decisions(tickers, risk_profile: str, horizon: str):
+    """Decision dicts for `tickers`; cache misses are scored together in one batch."""
+    cache = get_decision_cache()
+    decisions = [cache.get((t, risk_profile, horizon)) for t in tickers]
+    missing = [i for i, d in enumerate(decisions) if d is None]
+    if missing:
+        batch = get_demo_decisions_batch([tickers[i] for i in missing], risk_profile, horizon)
+        for k, i in enumerate(missing):
+            decisions[i] = decision_from_batch(batch, k, risk_profile)
+            cache.set((tickers[i], risk_profile, horizon), decisions[i])
+    return decisions
+
+
+def get_decision(ticker: str, risk_profile: str, horizon: str):
+    """Cached get_demo_decision."""
+    return get_cached_decisions([ticker], risk_profile, horizon)[0]
+
+
+# -----------------------------------------------------------------------------
+# Holdings Ledger (per-session, incremental valuation)
+# -----------------------------------------------------------------------------
+
+class HoldingsLedger:
+    """One row per lot, stored in NumPy arrays with running totals.
+
+    A price tick or position change rewrites only the affected rows and moves
+    total value/cost by the delta. Readers get P&L and weights as array views
+    without copying a DataFrame. `version` increases on every change so
+    derived results can be cached per portfolio state.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.size = 0
+        self.version = 0
+        self.total_value = 0.0
+        self.total_cost = 0.0
+        self.ticker_list = []
+        self._ticker_codes = {}
+        self._rows_by_ticker = {}
+        # Store build the current prices were last marked from (see get_holdings_ledger).
+        self.priced_from = None
+        self._alloc(capacity)
+
+    def _alloc(self, capacity: int):
+        old = getattr(self, "_arrays", None)
+        self._arrays = {
+            "code": np.zeros(capacity, dtype=np.int64),
+            "shares": np.zeros(capacity),
+            "buy_price": np.zeros(capacity),
+            "buy_date": np.zeros(capacity, dtype="datetime64[D]"),
+            "current_price": np.zeros(capacity),
+            "market_value": np.zeros(capacity),
+            "cost": np.zeros(capacity),
+            "unrealized_pl": np.zeros(capacity),
+        }
+        if old is not None:
+            for key, arr in old.items():
+                self._arrays[key][: self.size] = arr[: self.size]
+
+    @classmethod
+    def from_frame(cls, df):
+        ledger = cls(capacity=max(16, len(df)))
+        for row in df.itertuples(index=False):
+            ledger.add_lot(row.ticker, row.shares, row.buy_price, row.buy_date, row.current_price)
+        return ledger
+
+    def _view(self, key: str):
+        return self._arrays[key][: self.size]
+
+    @property
+    def codes(self):
+        return self._view("code")
+
+    @property
+    def tickers(self):
+        return np.array(self.ticker_list, dtype=object)[self.codes]
+
+    @property
+    def shares(self):
+        return self._view("shares")
+
+    @property
+    def buy_price(self):
+        return self._view("buy_price")
+
+    @property
+    def buy_date(self):
+        return self._view("buy_date")
+
+    @property
+    def current_price(self):
+        return self._view("current_price")
+
+    @property
+    def market_value(self):
+        return self._view("market_value")
+
+    @property
+    def unrealized_pl(self):
+        return self._view("unrealized_pl")
+
+    def add_lot(self, ticker: str, shares: float, buy_price: float, buy_date, current_price: float):
+        if self.size == len(self._arrays["code"]):
+            self._alloc(2 * self.size)
+        code = self._ticker_codes.get(ticker)
+        if code is None:
+            code = self._ticker_codes[ticker] = len(self.ticker_list)
+            self.ticker_list.append(ticker)
+            self._rows_by_ticker[ticker] = []
+
+        row = self.size
+        self.size += 1
+        a = self._arrays
+        a["code"][row] = code
+        a["shares"][row] = shares
+        a["buy_price"][row] = buy_price
+        a["buy_date"][row] = np.datetime64(pd.Timestamp(buy_date).date(), "D")
+        a["current_price"][row] = current_price
+        a["market_value"][row] = shares * current_price
+        a["cost"][row] = shares * buy_price
+        a["unrealized_pl"][row] = a["market_value"][row] - a["cost"][row]
+        self._rows_by_ticker[ticker].append(row)
+        self.total_value += a["market_value"][row]
+        self.total_cost += a["cost"][row]
+        self.version += 1
+        return row
+
+    def remove_lot(self, row: int):
+        """Drop one lot; the last row moves into its slot so removal is O(1)."""
+        a = self._arrays
+        self.total_value -= a["market_value"][row]
+        self.total_cost -= a["cost"][row]
+        ticker = self.ticker_list[a["code"][row]]
+        self._rows_by_ticker[ticker].remove(row)
+
+        last = self.size - 1
+        if row != last:
+            moved = self.ticker_list[a["code"][last]]
+            for arr in a.values():
+                arr[row] = arr[last]
+            rows = self._rows_by_ticker[moved]
+            rows[rows.index(last)] = row
+        self.size -= 1
+        self.version += 1
+
+    def set_shares(self, row: int, shares: float):
+        a = self._arrays
+        value = shares * a["current_price"][row]
+        cost = shares * a["buy_price"][row]
+        self.total_value += value - a["market_value"][row]
+        self.total_cost += cost - a["cost"][row]
+        a["shares"][row] = shares
+        a["market_value"][row] = value
+        a["cost"][row] = cost
+        a["unrealized_pl"][row] = value - cost
+        self.version += 1
+
+    def update_prices(self, tickers, prices):
+        """Apply price ticks; only lots of the ticked tickers are touched."""
+        a = self._arrays
+        for ticker, price in zip(tickers, prices):
+            rows = self._rows_by_ticker.get(ticker)
+            if not rows:
+                continue
+            value = a["shares"][rows] * price
+            self.total_value += float((value - a["market_value"][rows]).sum())
+            a["current_price"][rows] = price
+            a["market_value"][rows] = value
+            a["unrealized_pl"][rows] = value - a["cost"][rows]
+        self.version += 1
+
+    def ticker_weights(self):
+        """(tickers, weight %) aggregated over lots, in first-bought order."""
+        held = [t for t in self.ticker_list if self._rows_by_ticker[t]]
+        if not held or not self.total_value:
+            return held, np.zeros(len(held))
+        value = np.bincount(self.codes, weights=self.market_value, minlength=len(self.ticker_list))
+        value = value[[self._ticker_codes[t] for t in held]]
+        return held, value / self.total_value * 100
+
+
+# Each lot is marked at its ticker's last close within this many trailing bars.
+LEDGER_PRICE_LOOKBACK_BARS = 7
+
+
+def mark_to_store(ledger: HoldingsLedger, store: PriceHistoryStore):
+    """Reprice the ledger's lots at each ticker's latest close (provider bars for long-tail tickers)."""
+    held = [ledger.ticker_list[code] for code in np.unique(ledger.codes)]
+    closes = aligned_closes(store, held, -LEDGER_PRICE_LOOKBACK_BARS)
+    if held and closes.shape[1]:
+        finite = np.isfinite(closes)
+        last = closes.shape[1] - 1 - np.argmax(finite[:, ::-1], axis=1)
+        latest = closes[np.arange(len(held)), last]
+        priced = finite.any(axis=1)
+        ledger.update_prices([t for t, ok in zip(held, priced) if ok], latest[priced])
+    ledger.priced_from = store.path
+
+
+def get_holdings_ledger():
+    """This session's holdings ledger, marked to the stored closes whenever the store is rebuilt."""
+    ledger = st.session_state["ledger"]
+    store = get_price_history_store()
+    if ledger.priced_from != store.path:
+        mark_to_store(ledger, store)
+    return ledger
+
+
+# -----------------------------------------------------------------------------
+# Portfolio History Replay (holdings x price history)
+# -----------------------------------------------------------------------------
+
+def replay_portfolio_history(ledger: HoldingsLedger, store: PriceHistoryStore):
+    """Daily value and time-weighted % return of the ledger's lots, plus the tickers left out.
+
+    Lots become a (T, K) matrix of share deltas on their buy dates. One
+    cumulative sum turns it into shares held per day, and a single einsum
+    against the (K, T) close matrix values the whole timeline. Closes come
+    from aligned_closes(), so long-tail holdings are valued from provider
+    bars; tickers with no bars at all are left out and returned by name.
+    """
+    empty = pd.DataFrame({"date": [], "value": [], "return_pct": []})
+    if ledger.size == 0:
+        return empty, []
+
+    held_codes = np.unique(ledger.codes)
+    held = [ledger.ticker_list[code] for code in held_codes]
+    buy_ns = ledger.buy_date.astype("datetime64[ns]").astype(np.int64)
+    lo = int(np.searchsorted(store.timestamps, buy_ns.min(), side="left"))
+    timestamps = store.timestamps[lo:]
+    if not len(timestamps):
+        return empty, []
+    closes = aligned_closes(store, held, lo)
+    covered = ~np.isnan(closes).all(axis=1)
+    left_out = [t for t, ok in zip(held, covered) if not ok]
+    if not covered.any():
+        return empty, left_out
+
+    col_of_code = np.full(len(ledger.ticker_list), -1)
+    col_of_code[held_codes[covered]] = np.arange(int(covered.sum()))
+    lot_cols = col_of_code[ledger.codes]
+    keep = lot_cols >= 0
+    # Start at the first lot that is replayed, not at a left-out one.
+    first = int(np.searchsorted(timestamps, buy_ns[keep].min(), side="left"))
+    timestamps, lo = timestamps[first:], lo + first
+    if not len(timestamps):
+        return empty, left_out
+    closes = np.nan_to_num(closes[covered][:, first:])
+
+    day_idx = np.searchsorted(timestamps, buy_ns[keep], side="left")
+    in_range = day_idx < len(timestamps)
+    deltas = np.zeros((len(timestamps), len(closes)))
+    np.add.at(deltas, (day_idx[in_range], lot_cols[keep][in_range]), ledger.shares[keep][in_range])
+    shares_held = np.cumsum(deltas, axis=0)
+
+    value = np.einsum("tk,kt->t", shares_held, closes)
+    # Yesterday's holdings at today's closes, so new purchases are not counted as gains.
+    carried = np.einsum("tk,kt->t", shares_held[:-1], closes[:, 1:])
+    growth = np.divide(carried, value[:-1], out=np.ones_like(carried), where=value[:-1] > 0)
+    return_pct = np.r_[0.0, np.cumprod(growth) - 1] * 100
+
+    return pd.DataFrame({"date": store.dates[lo:], "value": value, "return_pct": return_pct}), left_out
+
+
+@profiled
+def get_portfolio_history():
+    """(history frame, tickers left out) from the replay, recomputed only when holdings or history change."""
+    ledger = get_holdings_ledger()
+    store = get_price_history_store()
+    key = (id(ledger), ledger.version, store.path)
+    cached = st.session_state.get("portfolio_history")
+    if cached is None or cached[0] != key:
+        cached = (key, replay_portfolio_history(ledger, store))
+        st.session_state["portfolio_history"] = cached
+    return cached[1]
+
+
+# -----------------------------------------------------------------------------
+# Portfolio Optimizer (shrinkage covariance + mean-variance)
+# -----------------------------------------------------------------------------
+
+# Store bars are calendar days (weekends included), so a year is 365 of them.
+BARS_PER_YEAR = 365
+MV_LOOKBACK_DAYS = BARS_PER_YEAR
+# Annualized expected return per unit of Decision Engine composite score.
+MV_RETURN_TILT = 0.10
+MV_PROFILE_PARAMS = {
+    "Conservative": {"risk_aversion": 8.0, "max_weight": 0.25},
+    "Moderate": {"risk_aversion": 4.0, "max_weight": 0.35},
+    "Aggressive": {"risk_aversion": 2.0, "max_weight": 0.50},
+}
+
+
+def shrinkage_covariance(returns):
+    """Ledoit-Wolf covariance of a (T, N) return matrix, shrunk toward a scaled identity."""
+    x = returns - returns.mean(axis=0)
+    t, n = x.shape
+    sample = x.T @ x / t
+    target = np.trace(sample) / n * np.eye(n)
+    d2 = np.sum((sample - target) ** 2)
+    b2 = (np.sum(np.einsum("ti,ti->t", x, x) ** 2) / t - np.sum(sample**2)) / t
+    shrink = 0.0 if d2 == 0 else min(1.0, max(0.0, b2 / d2))
+    return shrink * target + (1 - shrink) * sample
+
+
+@st.cache_resource
+def get_covariance_cache():
+    """Annualized covariances keyed by (universe, store build, lookback), shared across sessions."""
+    return CacheNamespace(get_shared_cache(), "covariance", 24 * 3600.0)
+
+
+@profiled
+def get_shrinkage_covariance(symbols, lookback: int = MV_LOOKBACK_DAYS):
+    """Cached (annualized covariance, budget_plane_lmax, covered) for `symbols`.
+
+    `covered` marks the symbols with a close on every bar of the lookback,
+    stored or from the provider. The covariance spans only those, in order;
+    lmax is None when none are covered.
+    """
+    store = get_price_history_store()
+    key = (tuple(symbols), store.path, lookback)
+    cache = get_covariance_cache()
+    entry = cache.get(key)
+    if entry is None:
+        closes = aligned_closes(store, symbols, -(lookback + 1))
+        covered = np.isfinite(closes).all(axis=1) & (closes.shape[1] > 2)
+        returns = np.diff(np.log(closes[covered]), axis=1).T
+        cov = shrinkage_covariance(returns) * BARS_PER_YEAR if covered.any() else np.zeros((0, 0))
+        entry = (cov, budget_plane_lmax(cov) if covered.any() else None, covered)
+        cache.set(key, entry)
+    return entry
+
+
+def budget_plane_lmax(cov):
+    """Largest eigenvalue of `cov` restricted to {d : sum(d) = 0}.
+
+    Weights move only within that plane, so this is the Lipschitz constant
+    that sets the optimizer's step. It is far below the full-space largest
+    eigenvalue, which the common market factor (roughly the all-ones
+    direction) dominates.
+    """
+    centered = cov - cov.mean(axis=0) - cov.mean(axis=1)[:, None] + cov.mean()
+    return float(np.linalg.eigvalsh(centered)[-1])
+
+
+def project_capped_simplex(v, cap: float):
+    """Euclidean projection of `v` onto {w : sum(w) = 1, 0 <= w <= cap}.
+
+    sum(clip(v - tau, 0, cap)) is piecewise linear in tau with breakpoints at
+    v and v - cap, so one sort locates tau exactly. Requires len(v) * cap >= 1.
+    """
+    n = len(v)
+    breakpoints = np.concatenate([v - cap, v])
+    step = np.concatenate([np.ones(n), -np.ones(n)])
+    order = np.argsort(breakpoints, kind="stable")
+    breakpoints = breakpoints[order]
+    active = np.cumsum(step[order])
+    total = n * cap - np.concatenate([[0.0], np.cumsum(active[:-1] * np.diff(breakpoints))])
+    k = np.searchsorted(-total, -1.0, side="right") - 1
+    tau = breakpoints[k] + (total[k] - 1.0) / active[k] if active[k] > 0 else breakpoints[k]
+    return np.clip(v - tau, 0.0, cap)
+
+
+def optimize_mean_variance(
+    mu, cov, risk_aversion: float, max_weight: float, lmax=None, max_iter: int = 500, tol: float = 1e-6
+):
+    """Long-only weights maximizing mu'w - risk_aversion / 2 * w'cov w with sum(w) = 1, w <= max_weight.
+
+    Accelerated projected gradient (FISTA with adaptive restart) with step
+    1 / (risk_aversion * lmax), where `lmax` is budget_plane_lmax(cov). The
+    cap is raised to 1/N when fewer than 1/max_weight assets are available.
+    """
+    n = len(mu)
+    cap = max(max_weight, 1.0 / n)
+    if lmax is None:
+        lmax = budget_plane_lmax(cov)
+    step = 1.0 / max(risk_aversion * lmax, 1e-12)
+
+    w = np.full(n, 1.0 / n)
+    y = w
+    t = 1.0
+    for _ in range(max_iter):
+        grad = mu - risk_aversion * (cov @ y)
+        w_next = project_capped_simplex(y + step * grad, cap)
+        if np.abs(w_next - w).max() < tol:
+            return w_next
+        if np.dot(y - w_next, w_next - w) > 0:
+            # Momentum is pointing uphill in the objective: restart it.
+            t = 1.0
+        t_next = (1.0 + np.sqrt(1.0 + 4.0 * t * t)) / 2.0
+        y = w_next + (t - 1.0) / t_next * (w_next - w)
+        w, t = w_next, t_next
+    return w
+
+
+@profiled
+def get_optimal_allocation(symbols, composites, current, risk_profile: str):
+    """Model weights (fractions summing to 1) for `symbols`, tilted by Decision Engine composites.
+
+    Holdings without a full lookback of closes cannot be modelled, so they
+    keep their `current` weight and the rest is optimized over the remainder.
+    """
+    params = MV_PROFILE_PARAMS[risk_profile]
+    cov, lmax, covered = get_shrinkage_covariance(symbols)
+    weights = np.asarray(current, dtype=float).copy()
+    free = 1.0 - weights[~covered].sum()
+    if covered.any() and free > 0:
+        mu = MV_RETURN_TILT * np.asarray(composites, dtype=float)[covered]
+        weights[covered] = free * optimize_mean_variance(
+            mu, cov, params["risk_aversion"], params["max_weight"], lmax=lmax
+        )
+    return weights
+
+
+# -----------------------------------------------------------------------------
+# Monte Carlo Allocation Simulator
+# -----------------------------------------------------------------------------
+
+HORIZON_DAYS = {"Day": 1, "Week": 7, "Month": 30, "Year": BARS_PER_YEAR}
+MC_DEFAULT_PATHS = 20000
+MC_MEMORY_BUDGET_BYTES = 32 * 1024**2
+MC_CONFIDENCE = 0.95
+# Worker processes for simulate_allocations (QF_MC_WORKERS); 0 or 1 runs in-process.
+MC_WORKERS = int(os.environ.get("QF_MC_WORKERS", "0"))
+
+
+@st.cache_resource
+def get_mc_pool(workers: int):
+    """Process pool shared by every session for Monte Carlo chunks, or None if none can start.
+
+    Forking this threaded server could copy a lock some other thread holds,
+    so workers come from a fork server (or are spawned) and import the chunk
+    kernel from quantumflow_mc. The script re-runs as __mp_main__ there, and
+    its __main__ guard keeps the app itself from starting.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    method = next((m for m in ("forkserver", "spawn") if m in methods), None)
+    if method is None:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def simulate_allocations(
+    weights,
+    mu,
+    cov,
+    horizon_days: int,
+    n_paths: int = MC_DEFAULT_PATHS,
+    memory_budget: int = MC_MEMORY_BUDGET_BYTES,
+    workers: int = 0,
+    seed=None,
+):
+    """Monte Carlo of several weight vectors over `horizon_days` daily bars.
+
+    Asset returns are jointly Gaussian (annualized `mu`, `cov`), so the K
+    portfolio return series are too. The simulation draws those K series
+    directly, not all N assets, and every portfolio shares the same draws.
+    Paths run in chunks sized so one chunk's working set stays within
+    `memory_budget` bytes. Only per-path summaries are kept, so 100k+ paths
+    need O(paths) memory. With `workers` > 1, chunks go to the shared pool
+    from get_mc_pool; without one they run in-process.
+
+    Returns the horizon-return and max-drawdown matrices, both (paths, K).
+    """
+    w = np.column_stack(weights)
+    mean = w.T @ mu / BARS_PER_YEAR
+    vals, vecs = np.linalg.eigh(w.T @ cov @ w / BARS_PER_YEAR)
+    root = vecs * np.sqrt(np.clip(vals, 0.0, None))
+
+    # Draws, returns/growth and the running peak are the three live (paths, horizon, K) blocks.
+    bytes_per_path = 3 * horizon_days * w.shape[1] * 8
+    chunk = max(1, min(n_paths, memory_budget // bytes_per_path))
+    sizes = [min(chunk, n_paths - start) for start in range(0, n_paths, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, size, horizon_days, mean, root) for s, size in zip(seeds, sizes)]
+
+    pool = get_mc_pool(workers) if workers > 1 else None
+    results = None
+    if pool is not None:
+        try:
+            results = list(pool.map(simulate_portfolio_chunk, tasks))
+        except BrokenProcessPool:
+            # A worker died; drop the pool so the next call starts a fresh one.
+            get_mc_pool.clear()
+    if results is None:
+        results = [simulate_portfolio_chunk(task) for task in tasks]
+    returns = np.concatenate([r for r, _ in results])
+    drawdowns = np.concatenate([d for _, d in results])
+    return returns, drawdowns
+
+
+def summarize_simulation(returns, drawdowns, horizon_days: int, confidence: float = MC_CONFIDENCE):
+    """Per-portfolio risk/return summary (percentages) of simulate_allocations output."""
+    tail = np.quantile(returns, 1.0 - confidence, axis=0)
+    in_tail = returns <= tail
+    cvar = (returns * in_tail).sum(axis=0) / np.maximum(in_tail.sum(axis=0), 1)
+    return {
+        "expected_return_pct": returns.mean(axis=0) * 100,
+        "volatility_pct": returns.std(axis=0) * np.sqrt(BARS_PER_YEAR / horizon_days) * 100,
+        "var_pct": -tail * 100,
+        "cvar_pct": -cvar * 100,
+        "max_drawdown_median_pct": np.median(drawdowns, axis=0) * 100,
+        "max_drawdown_tail_pct": np.quantile(drawdowns, 1.0 - confidence, axis=0) * 100,
     }
 
 
+@profiled
+def get_allocation_simulation(tickers, current, proposed, mu, horizon: str):
+    """Simulated summary for current vs proposed weights, cached in session state per input set.
+
+    Holdings without a full lookback of closes have no return model; they are
+    simulated as cash (no return, no risk) at their weight in each portfolio.
+    """
+    horizon_days = HORIZON_DAYS[horizon]
+    rounded = (np.round(v, 6).tobytes() for v in (current, proposed, mu))
+    key = (tuple(tickers), *rounded, horizon_days)
+    cached = st.session_state.get("allocation_simulation")
+    if cached is None or cached[0] != key:
+        covered_cov, _, covered = get_shrinkage_covariance(tickers)
+        cov = np.zeros((len(tickers), len(tickers)))
+        cov[np.ix_(covered, covered)] = covered_cov
+        mu = np.where(covered, mu, 0.0)
+        returns, drawdowns = simulate_allocations(
+            [current, proposed],
+            mu,
+            cov,
+            horizon_days,
+            workers=MC_WORKERS,
+            seed=stable_seed("allocation_mc", *tickers, horizon),
+        )
+        cached = (key, summarize_simulation(returns, drawdowns, horizon_days))
+        st.session_state["allocation_simulation"] = cached
+    return cached[1]
+
+
+# -----------------------------------------------------------------------------
+# Risk Engine (vol, VaR/CVaR, drawdown, beta for the whole store)
+# -----------------------------------------------------------------------------
+
+RISK_LOOKBACK_DAYS = BARS_PER_YEAR
+# Four calendar weeks, the calendar-day equivalent of the usual 20-session window.
+RISK_VOL_WINDOW = 28
+RISK_CONFIDENCE = 0.95
+RISK_BENCHMARK = "S&P 500"
+RISK_METRIC_COLUMNS = [
+    "vol_pct",
+    "vol_percentile",
+    "vol_level",
+    "var_hist_pct",
+    "cvar_hist_pct",
+    "var_param_pct",
+    "cvar_param_pct",
+    "max_drawdown_pct",
+    "beta",
+    "n_obs",
+]
+
+
+def compute_risk_metrics(
+    closes, benchmark_row: int, vol_window: int = RISK_VOL_WINDOW, confidence: float = RISK_CONFIDENCE
+):
+    """Risk metrics for every row of an (N, T + 1) close matrix in one vectorized pass.
+
+    Returns a dict of length-N arrays. Values are percentages except beta and
+    vol_percentile, which is where today's rolling vol ranks within its own
+    lookback history. VaR/CVaR are 1-day losses at `confidence`. A store with
+    fewer than `vol_window` returns uses all of them as the vol window, and
+    one with fewer than two gets NaN metrics.
+    """
+    returns = np.diff(closes, axis=1) / closes[:, :-1]
+    n_obs = returns.shape[1]
+    if n_obs < 2:
+        known = {"vol_level": np.full(len(closes), VOLATILITY_UNKNOWN), "n_obs": np.full(len(closes), n_obs)}
+        return {name: known.get(name, np.full(len(closes), np.nan)) for name in RISK_METRIC_COLUMNS}
+    vol_window = min(vol_window, n_obs)
+
+    # Rolling realized vol from windowed sums of r and r^2.
+    padded = np.pad(returns, ((0, 0), (1, 0)))
+    s1 = np.cumsum(padded, axis=1)
+    s2 = np.cumsum(padded**2, axis=1)
+    win1 = s1[:, vol_window:] - s1[:, :-vol_window]
+    win2 = s2[:, vol_window:] - s2[:, :-vol_window]
+    rolling_var = np.clip((win2 - win1**2 / vol_window) / (vol_window - 1), 0.0, None)
+    rolling_vol = np.sqrt(rolling_var * BARS_PER_YEAR)
+    vol = rolling_vol[:, -1]
+    vol_percentile = (rolling_vol <= vol[:, None]).mean(axis=1)
+
+    tail = np.quantile(returns, 1.0 - confidence, axis=1)
+    in_tail = returns <= tail[:, None]
+    hist_cvar = (returns * in_tail).sum(axis=1) / np.maximum(in_tail.sum(axis=1), 1)
+
+    mean = returns.mean(axis=1)
+    std = returns.std(axis=1, ddof=1)
+    normal = NormalDist()
+    z = normal.inv_cdf(confidence)
+    param_var = z * std - mean
+    param_cvar = std * normal.pdf(z) / (1.0 - confidence) - mean
+
+    peak = np.maximum.accumulate(closes, axis=1)
+    max_drawdown = (closes / peak).min(axis=1) - 1.0
+
+    centered = returns - mean[:, None]
+    bench = centered[benchmark_row]
+    beta = centered @ bench / (bench @ bench)
+
+    return {
+        "vol_pct": vol * 100,
+        "vol_percentile": vol_percentile,
+        "vol_level": VOLATILITY_LEVELS[np.digitize(vol_percentile, [1 / 3, 2 / 3])],
+        "var_hist_pct": -tail * 100,
+        "cvar_hist_pct": -hist_cvar * 100,
+        "var_param_pct": param_var * 100,
+        "cvar_param_pct": param_cvar * 100,
+        "max_drawdown_pct": max_drawdown * 100,
+        "beta": beta,
+        "n_obs": np.full(len(closes), n_obs),
+    }
+
+
+@st.cache_resource(max_entries=2)
+def _risk_table_for(store_path: str):
+    store = PriceHistoryStore(store_path)
+    closes = np.asarray(store.fields["close"][:, -(RISK_LOOKBACK_DAYS + 1):])
+    metrics = compute_risk_metrics(closes, store.rows([RISK_BENCHMARK])[0])
+    return pd.DataFrame(metrics, index=pd.Index(store.symbols, name="symbol"))
+
+
+@profiled
+def get_risk_table():
+    """Risk metrics for every stored ticker and index, computed once per day for all sessions."""
+    return _risk_table_for(get_price_history_store().path)
+
+
+# -----------------------------------------------------------------------------
+# Screener
+# -----------------------------------------------------------------------------
+
+SCREENER_PAGE_SIZES = [25, 50, 100]
+SCREENER_SORT_COLUMNS = {
+    "Model score": "score",
+    "Daily %": "daily_pct",
+    "Price": "price",
+    "Ticker": "ticker",
+}
+
+
+@st.cache_resource
+def get_symbol_universe():
+    """Named demo tickers followed by synthetic listings up to UNIVERSE_SIZE (never fewer than the core)."""
+    return NAMED_TICKERS + synthetic_tickers(max(UNIVERSE_SIZE, len(AVAILABLE_TICKERS)) - len(NAMED_TICKERS))
+
+
+class ScreenerTable:
+    """Columnar snapshot of the universe with sort orders computed once.
+
+    query() only does vectorized mask and index work over the precomputed
+    orders, and page() materializes just the requested rows, so rendering
+    cost follows the page size rather than the universe size.
+    """
+
+    COLUMNS = ["ticker", "price", "daily_pct", "volatility", "action", "score"]
+
+    def __init__(self, columns):
+        self.columns = {name: np.asarray(columns[name]) for name in self.COLUMNS}
+        self.n = len(self.columns["ticker"])
+        self._orders = {
+            name: np.argsort(self.columns[name], kind="stable") for name in SCREENER_SORT_COLUMNS.values()
+        }
+        self._upper = np.char.upper(self.columns["ticker"].astype(str))
+
+    @classmethod
+    def build(cls, symbols, risk_profile: str, horizon: str):
+        """Columns straight from one decision batch, without per-ticker dicts or the decision cache.
+
+        Volatility is the risk engine's measured level; symbols outside the
+        history store have none and show VOLATILITY_UNKNOWN.
+        """
+        batch = get_demo_decisions_batch(symbols, risk_profile, horizon)
+        quotes = get_demo_quotes(symbols)
+        measured = get_risk_table()["vol_level"].reindex(symbols).to_numpy()
+        volatility = np.where(pd.isna(measured), VOLATILITY_UNKNOWN, measured)
+        return cls(
+            {
+                "ticker": np.array(symbols),
+                "price": quotes["price"],
+                "daily_pct": quotes["daily_pct"],
+                "volatility": volatility.astype(str),
+                "action": np.asarray(batch["action"]),
+                "score": np.asarray(batch["composite"], dtype=np.float64),
+            }
+        )
+
+    def query(self, sort_by: str = "score", descending: bool = True, actions=None, volatility=None, prefix: str = ""):
+        """Row indices matching the filters, in sort order."""
+        mask = np.ones(self.n, dtype=bool)
+        if actions:
+            mask &= np.isin(self.columns["action"], list(actions))
+        if volatility:
+            mask &= np.isin(self.columns["volatility"], list(volatility))
+        if prefix:
+            mask &= np.char.startswith(self._upper, prefix.strip().upper())
+        order = self._orders[sort_by]
+        if descending:
+            order = order[::-1]
+        return order[mask[order]]
+
+    def page(self, indices, page: int, page_size: int):
+        """DataFrame of the rows on 1-based `page` of `indices`."""
+        rows = indices[(page - 1) * page_size : page * page_size]
+        return pd.DataFrame({name: col[rows] for name, col in self.columns.items()})
+
+
+def _rebuild_screener_table(risk_profile: str, horizon: str):
+    return ScreenerTable.build(get_symbol_universe(), risk_profile, horizon)
+
+
+@profiled
+def get_screener_table(risk_profile: str, horizon: str):
+    """Universe screener for one profile, shared across sessions and re-scored in the background."""
+    name = f"screener/{risk_profile}/{horizon}"
+    scheduler = get_refresh_scheduler()
+    scheduler.register(
+        name,
+        _rebuild_screener_table,
+        REFRESH_INTERVALS["screener"],
+        risk_profile,
+        horizon,
+        expire_after=REFRESH_EXPIRE_SECONDS,
+    )
+    return scheduler.read(name)
+
+
+# -----------------------------------------------------------------------------
+# Symbol Search
+# -----------------------------------------------------------------------------
+
+SEARCH_SUGGESTION_LIMIT = 8
+SEARCH_MIN_TRIGRAM_SCORE = 0.3
+_PREFIX_END = "\uffff"
+
+
+def _trigrams(text: str):
+    padded = f"  {text.lower()} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolIndex:
+    """Autocomplete index over the symbol master (tickers and company names).
+
+    Prefix lookups binary-search sorted key arrays, which is a trie
+    flattened into arrays: every prefix's subtree is one contiguous slice.
+    Fuzzy lookups score trigram overlap (Dice coefficient) from a CSR
+    posting list. Everything is a plain NumPy array, so the index loads
+    from a single prebuilt .npz without pickling.
+    """
+
+    ARRAYS = [
+        "tickers",
+        "names",
+        "ticker_keys",
+        "ticker_ids",
+        "word_keys",
+        "word_ids",
+        "gram_keys",
+        "gram_offsets",
+        "gram_ids",
+        "gram_counts",
+    ]
+
+    def __init__(self, **arrays):
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.n = len(self.tickers)
+
+    @classmethod
+    def build(cls, tickers, names):
+        tickers = np.asarray(tickers, dtype=str)
+        names = np.asarray(names, dtype=str)
+
+        upper = np.char.upper(tickers)
+        ticker_ids = np.argsort(upper, kind="stable")
+
+        words, word_ids = [], []
+        for i, name in enumerate(names):
+            for word in name.lower().replace(".", " ").split():
+                words.append(word)
+                word_ids.append(i)
+        words = np.asarray(words, dtype=str)
+        word_order = np.argsort(words, kind="stable")
+
+        postings = {}
+        gram_counts = np.empty(len(tickers), dtype=np.int64)
+        for i, (ticker, name) in enumerate(zip(tickers, names)):
+            grams = _trigrams(ticker) | _trigrams(name)
+            gram_counts[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        gram_keys = np.asarray(sorted(postings), dtype=str)
+        lengths = np.array([len(postings[g]) for g in gram_keys], dtype=np.int64)
+
+        return cls(
+            tickers=tickers,
+            names=names,
+            ticker_keys=upper[ticker_ids],
+            ticker_ids=ticker_ids,
+            word_keys=words[word_order],
+            word_ids=np.asarray(word_ids, dtype=np.int64)[word_order],
+            gram_keys=gram_keys,
+            gram_offsets=np.concatenate(([0], np.cumsum(lengths))),
+            gram_ids=np.concatenate([np.asarray(postings[g], dtype=np.int64) for g in gram_keys]),
+            gram_counts=gram_counts,
+        )
+
+    def save(self, path: str):
+        tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}.npz"
+        np.savez(tmp, **{name: getattr(self, name) for name in self.ARRAYS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in cls.ARRAYS})
+
+    @staticmethod
+    def _prefix_slice(keys, prefix: str):
+        # Needles must share the keys' fixed-width dtype, otherwise NumPy
+        # casts the whole key array on every search.
+        width = keys.dtype.itemsize // 4
+        if len(prefix) > width:
+            return 0, 0
+        needle = np.asarray(prefix, dtype=keys.dtype)
+        lo = np.searchsorted(keys, needle, side="left")
+        if len(prefix) == width:
+            return lo, np.searchsorted(keys, needle, side="right")
+        return lo, np.searchsorted(keys, np.asarray(prefix + _PREFIX_END, dtype=keys.dtype), side="left")
+
+    def _fuzzy(self, query: str, limit: int):
+        grams = _trigrams(query)
+        keys = np.asarray(sorted(grams), dtype=self.gram_keys.dtype)
+        pos = np.searchsorted(self.gram_keys, keys)
+        found = pos < len(self.gram_keys)
+        found[found] = self.gram_keys[pos[found]] == keys[found]
+        pos = pos[found]
+        if not len(pos):
+            return []
+        ids = np.concatenate([self.gram_ids[self.gram_offsets[p] : self.gram_offsets[p + 1]] for p in pos])
+        overlap = np.bincount(ids, minlength=self.n)
+        score = 2.0 * overlap / (len(grams) + self.gram_counts)
+        candidates = np.flatnonzero(score >= SEARCH_MIN_TRIGRAM_SCORE)
+        score = score[candidates]
+        if len(candidates) > limit:
+            top = np.argpartition(-score, limit)[:limit]
+            candidates, score = candidates[top], score[top]
+        return candidates[np.argsort(-score, kind="stable")].tolist()
+
+    def search(self, query: str, limit: int = SEARCH_SUGGESTION_LIMIT):
+        """Ranked (ticker, name) suggestions: ticker prefix, then name-word prefix, then fuzzy."""
+        query = query.strip()
+        if not query:
+            return []
+        hits = []
+        lo, hi = self._prefix_slice(self.ticker_keys, query.upper())
+        hits.extend(self.ticker_ids[lo : min(hi, lo + limit)].tolist())
+        if len(hits) < limit:
+            word = query.lower().split()[0]
+            lo, hi = self._prefix_slice(self.word_keys, word)
+            hits.extend(self.word_ids[lo : min(hi, lo + 4 * limit)].tolist())
+        if len(hits) < limit and len(query) >= 3:
+            hits.extend(self._fuzzy(query, limit))
+        ranked = list(dict.fromkeys(hits))[:limit]
+        return [(str(self.tickers[i]), str(self.names[i])) for i in ranked]
+
+    def resolve(self, query: str):
+        """Exact ticker match (case-insensitive), or None."""
+        lo, hi = self._prefix_slice(self.ticker_keys, query.strip().upper())
+        if lo < hi and self.ticker_keys[lo] == query.strip().upper():
+            return str(self.tickers[self.ticker_ids[lo]])
+        return None
+
+
+@st.cache_resource
+def get_symbol_index():
+    """Symbol index shared across sessions, loaded from its prebuilt file when present."""
+    master = get_market_data_provider().symbol_master()
+    content = "\n".join(master["ticker"] + "\t" + master["name"]).encode("utf-8")
+    digest = hashlib.blake2b(content, digest_size=8).hexdigest()
+    root = os.path.join(DATA_CACHE_DIR, "symbols")
+    path = os.path.join(root, f"index-{digest}.npz")
+    if os.path.exists(path):
+        return SymbolIndex.load(path)
+    index = SymbolIndex.build(master["ticker"].to_numpy(), master["name"].to_numpy())
+    os.makedirs(root, exist_ok=True)
+    index.save(path)
+    for old in glob.glob(os.path.join(root, "index-*.npz")):
+        if old != path:
+            os.remove(old)
+    return index
+
+
+# -----------------------------------------------------------------------------
+# Sentiment Engine (local lexicon scorer)
+# -----------------------------------------------------------------------------
+
+SENTIMENT_LEXICON = {
+    **dict.fromkeys("soar soars".split(), 2.5),
+    **dict.fromkeys("rally rallies surge surges upbeat upgrade upgraded bullish".split(), 2.0),
+    **dict.fromkeys(
+        "gain gains climb climbs beat beats strong outperform supportive recovery optimism positive".split(), 1.5
+    ),
+    **dict.fromkeys("firm record highs growth profit profits leadership".split(), 1.0),
+    **dict.fromkeys("demand".split(), 0.5),
+    **dict.fromkeys("regulators debate".split(), -0.5),
+    **dict.fromkeys("trim risk risks cautious concern concerns".split(), -1.0),
+    **dict.fromkeys(
+        "fall falls drop drops miss misses cut cuts pressure inquiry probe weak loss losses overheating "
+        "negative".split(),
+        -1.5,
+    ),
+    **dict.fromkeys("slide slides slump downgrade downgraded bearish lawsuit selloff".split(), -2.0),
+    **dict.fromkeys("plunge plunges".split(), -2.5),
+}
+SENTIMENT_PHRASES = {
+    "pull back": -1.5,
+    "take profits": -1.5,
+    "taking profits": -1.5,
+    "profit taking": -1.5,
+    "headline risk": -1.0,
+}
+SENTIMENT_NEGATORS = {"not", "no", "never", "without", "isn't", "aren't", "don't", "doesn't"}
+SENTIMENT_NEGATION_SCALE = -0.74
+# VADER-style squashing: raw / sqrt(raw^2 + alpha) maps any sum into (-1, 1).
+SENTIMENT_ALPHA = 15.0
+SENTIMENT_NEUTRAL_BAND = 0.15
+SENTIMENT_CACHE_TTL_SECONDS = 7 * 24 * 3600.0
+_TOKEN_RE = re.compile(r"[a-z][a-z']*")
+
+
+def score_texts_uncached(texts):
+    """Lexicon sentiment in [-1, 1] for a batch of texts.
+
+    Only tokenizing is per text. Lexicon weights, negation ("not strong"),
+    two-word phrases and the per-document sums run as array operations
+    over every token in the batch at once.
+    """
+    tokens, doc = [], []
+    for i, text in enumerate(texts):
+        words = _TOKEN_RE.findall(text.lower())
+        tokens.extend(words)
+        doc.extend([i] * len(words))
+    if not tokens:
+        return np.zeros(len(texts))
+    doc = np.asarray(doc, dtype=np.int64)
+    weights = np.fromiter((SENTIMENT_LEXICON.get(t, 0.0) for t in tokens), dtype=np.float64, count=len(tokens))
+    negator = np.fromiter((t in SENTIMENT_NEGATORS for t in tokens), dtype=bool, count=len(tokens))
+
+    same_doc = doc[1:] == doc[:-1]
+    negated = np.zeros(len(tokens), dtype=bool)
+    negated[1:] = negator[:-1] & same_doc
+    weights[negated] *= SENTIMENT_NEGATION_SCALE
+
+    phrases = np.fromiter(
+        (SENTIMENT_PHRASES.get(f"{a} {b}", 0.0) for a, b in zip(tokens, tokens[1:])),
+        dtype=np.float64,
+        count=len(tokens) - 1,
+    )
+    raw = np.bincount(doc, weights=weights, minlength=len(texts))
+    raw += np.bincount(doc[:-1], weights=np.where(same_doc, phrases, 0.0), minlength=len(texts))
+    return raw / np.sqrt(raw * raw + SENTIMENT_ALPHA)
+
+
+def sentiment_label(score: float):
+    if score >= SENTIMENT_NEUTRAL_BAND:
+        return "Positive"
+    if score <= -SENTIMENT_NEUTRAL_BAND:
+        return "Negative"
+    return "Neutral"
+
+
+@st.cache_resource
+def get_sentiment_cache():
+    """Scores keyed by a content hash of the text, shared across sessions."""
+    return CacheNamespace(get_shared_cache(), "sentiment", SENTIMENT_CACHE_TTL_SECONDS)
+
+
+def score_texts(texts):
+    """Sentiment per text; only content never seen before reaches the scorer.
+
+    Keys are content hashes, so re-renders and syndicated copies of the same
+    story (within a batch or across batches) are scored once.
+    """
+    cache = get_sentiment_cache()
+    keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() for text in texts]
+    known = {}
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key in known or key in pending:
+            continue
+        score = cache.get(key)
+        if score is None:
+            pending[key] = text
+        else:
+            known[key] = score
+    if pending:
+        for key, score in zip(pending, score_texts_uncached(list(pending.values()))):
+            known[key] = float(score)
+            cache.set(key, known[key])
+    return np.array([known[key] for key in keys], dtype=np.float64)
+
+
+# -----------------------------------------------------------------------------
+# News Ingestion
+# -----------------------------------------------------------------------------
+
+NEWS_STREAM_PATH = os.environ.get("QF_NEWS_STREAM", os.path.join(DATA_CACHE_DIR, "news", "stream.jsonl"))
+NEWS_DEMO_BACKLOG = int(os.environ.get("QF_NEWS_BACKLOG", "0"))
+NEWS_RETENTION_ITEMS = 250000
+NEWS_RETENTION_DAYS = 30
+NEWS_PAGE_SIZE = 20
+
+
+def read_jsonl_since(path: str, offset: int = 0):
+    """(records, new_offset) for complete JSON lines appended to `path` after byte `offset`."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return [], offset
+    if size <= offset:
+        return [], offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read(size - offset)
+    # A writer may be mid-line; leave the partial record for next time.
+    complete = chunk.rfind(b"\n") + 1
+    records = [json.loads(line) for line in chunk[:complete].splitlines() if line.strip()]
+    return records, offset + complete
+
+
+def last_jsonl_time(path: str, tail_bytes: int = 64 * 1024):
+    """Timestamp of the last complete record in a JSONL stream file, or None if there is none."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    with open(path, "rb") as f:
+        f.seek(max(size - tail_bytes, 0))
+        chunk = f.read()
+    lines = [line for line in chunk[: chunk.rfind(b"\n") + 1].splitlines() if line.strip()]
+    if not lines:
+        return None
+    try:
+        return datetime.fromisoformat(json.loads(lines[-1])["time"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class NewsStore:
+    """Bounded in-memory article store with time, ticker and source indexes.
+
+    Every index is a deque of article ids in time order, so "latest N"
+    queries walk back from the right end and cost O(N) regardless of
+    how much is stored. Articles arrive roughly in time order; a late one
+    is slotted in by scanning back from the end. Retention drops the
+    oldest articles once there are more than `max_items` or they are
+    older than `max_age`.
+    """
+
+    def __init__(self, max_items: int = NEWS_RETENTION_ITEMS, max_age: timedelta = timedelta(days=NEWS_RETENTION_DAYS)):
+        self.max_items = max_items
+        self.max_age = max_age
+        self._items = {}
+        self._by_time = deque()
+        self._by_ticker = defaultdict(deque)
+        self._by_source = defaultdict(deque)
+        self._ticker_sentiment = defaultdict(lambda: [0.0, 0])
+        self._next_id = 0
+        self._offsets = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _insert(self, index: deque, item_id: int, when: datetime):
+        if not index or self._items[index[-1]]["time"] <= when:
+            index.append(item_id)
+            return
+        pos = len(index)
+        while pos > 0 and self._items[index[pos - 1]]["time"] > when:
+            pos -= 1
+        index.insert(pos, item_id)
+
+    @staticmethod
+    def _discard(index: deque, item_id: int):
+        if index[0] == item_id:
+            index.popleft()
+        else:
+            index.remove(item_id)
+
+    def _evict(self, now: datetime):
+        cutoff = now - self.max_age
+        while self._by_time and (len(self._items) > self.max_items or self._items[self._by_time[0]]["time"] < cutoff):
+            item_id = self._by_time.popleft()
+            item = self._items.pop(item_id)
+            for ticker in item["tickers"]:
+                self._discard(self._by_ticker[ticker], item_id)
+                if not self._by_ticker[ticker]:
+                    del self._by_ticker[ticker]
+                    del self._ticker_sentiment[ticker]
+                else:
+                    agg = self._ticker_sentiment[ticker]
+                    agg[0] -= item["sentiment_score"]
+                    agg[1] -= 1
+            self._discard(self._by_source[item["source"]], item_id)
+            if not self._by_source[item["source"]]:
+                del self._by_source[item["source"]]
+
+    def extend(self, items):
+        """Score and index new articles (dicts shaped like get_demo_news_feed items)."""
+        items = list(items)
+        scores = score_texts([f"{item['headline']}. {item['summary']}" for item in items])
+        with self._lock:
+            for item, score in zip(items, scores):
+                item["sentiment_score"] = float(score)
+                item["sentiment"] = sentiment_label(score)
+                item_id = self._next_id
+                self._next_id += 1
+                self._items[item_id] = item
+                self._insert(self._by_time, item_id, item["time"])
+                for ticker in item["tickers"]:
+                    self._insert(self._by_ticker[ticker], item_id, item["time"])
+                    agg = self._ticker_sentiment[ticker]
+                    agg[0] += item["sentiment_score"]
+                    agg[1] += 1
+                self._insert(self._by_source[item["source"]], item_id, item["time"])
+            self._evict(datetime.utcnow())
+
+    def ingest(self, path: str):
+        """Index lines appended to the JSONL stream at `path` since the last call; returns the count."""
+        records, self._offsets[path] = read_jsonl_since(path, self._offsets.get(path, 0))
+        for item in records:
+            item["time"] = datetime.fromisoformat(item["time"])
+        self.extend(records)
+        return len(records)
+
+    def latest(self, n: int = NEWS_PAGE_SIZE, ticker: str = None, source: str = None):
+        """Newest `n` articles overall, for one ticker, or from one source."""
+        with self._lock:
+            if ticker is not None:
+                index = self._by_ticker.get(ticker, ())
+            elif source is not None:
+                index = self._by_source.get(source, ())
+            else:
+                index = self._by_time
+            n = min(n, len(index))
+            return [self._items[index[-1 - k]] for k in range(n)]
+
+    def sources(self):
+        with self._lock:
+            return sorted(self._by_source)
+
+    def ticker_sentiment(self, ticker: str):
+        """(mean sentiment, article count) over the retained articles tagging `ticker`."""
+        with self._lock:
+            total, count = self._ticker_sentiment.get(ticker, (0.0, 0))
+        return (total / count if count else 0.0), count
+
+
+def write_jsonl_stream(path: str, items):
+    """Append records to a JSONL stream file (the stand-in for a news or social queue)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps({**item, "time": item["time"].isoformat()}) + "\n")
+
+
+@st.cache_resource
+def _open_news_store(stream_path: str):
+    store = NewsStore()
+    store.extend(get_market_data_provider().news())
+    if NEWS_DEMO_BACKLOG and not os.path.exists(stream_path):
+        write_jsonl_stream(stream_path, get_demo_news_stream(NEWS_DEMO_BACKLOG))
+    return store
+
+
+def _ingest_news():
+    store = _open_news_store(NEWS_STREAM_PATH)
+    store.ingest(NEWS_STREAM_PATH)
+    return store
+
+
+def get_news_store():
+    """Shared news store; the refresh scheduler tops it up from the stream in the background."""
+    return get_refresh_scheduler().read("news")
+
+
+@profiled
+def get_ticker_news(ticker: str, n: int = NEWS_PAGE_SIZE):
+    return get_news_store().latest(n, ticker=ticker)
+
+
+@profiled
+def get_sentiment_summary(ticker: str):
+    score, count = get_news_store().ticker_sentiment(ticker)
+    if count:
+        text = f"Average of {count} recent {'story' if count == 1 else 'stories'} scored by the local sentiment model."
+    else:
+        text = "No recent stories mention this ticker yet."
+    return {"score": score, "label": sentiment_label(score), "text": text}
+
+
+# -----------------------------------------------------------------------------
+# Social Signal Aggregator (windowed, per ticker)
+# -----------------------------------------------------------------------------
+
+SOCIAL_REPLAY_PATH = os.environ.get("QF_SOCIAL_REPLAY", os.path.join(DATA_CACHE_DIR, "social", "replay.jsonl"))
+SOCIAL_DEMO_BACKLOG = int(os.environ.get("QF_SOCIAL_BACKLOG", "3000"))
+# Window label -> (span in seconds, ring buckets).
+SOCIAL_WINDOWS = {"1h": (3600, 60), "24h": (24 * 3600, 96), "7d": (7 * 24 * 3600, 168)}
+SOCIAL_EMA_HALF_LIVES = {"fast": 3600.0, "slow": 24 * 3600.0}
+SOCIAL_BURST_Z = 3.0
+SOCIAL_BURST_MIN_MENTIONS = 5
+SOCIAL_RECENT_POSTS = 3
+SOCIAL_ALL = "*"
+
+
+class RollingCounts:
+    """Sliding-window event counts for many rows, bucketed into one ring.
+
+    Every row shares the clock, so advancing the window clears whole
+    bucket columns at once. A running total per row makes reads O(1).
+    Memory is fixed at rows x buckets whatever the event volume.
+    """
+
+    def __init__(self, span_seconds: float, n_buckets: int, capacity: int = 16):
+        self.width = span_seconds / n_buckets
+        self.n_buckets = n_buckets
+        self.buckets = np.zeros((capacity, n_buckets))
+        self.totals = np.zeros(capacity)
+        self.head = None
+
+    def grow(self, capacity: int):
+        self.buckets = np.vstack([self.buckets, np.zeros((capacity - len(self.totals), self.n_buckets))])
+        self.totals = np.append(self.totals, np.zeros(capacity - len(self.totals)))
+
+    def advance(self, now_seconds: float):
+        bucket = int(now_seconds // self.width)
+        if self.head is None:
+            self.head = bucket
+        steps = bucket - self.head
+        if steps <= 0:
+            return
+        if steps >= self.n_buckets:
+            self.buckets[:] = 0.0
+            self.totals[:] = 0.0
+        else:
+            cols = np.arange(self.head + 1, bucket + 1) % self.n_buckets
+            self.totals -= self.buckets[:, cols].sum(axis=1)
+            self.buckets[:, cols] = 0.0
+        self.head = bucket
+
+    def add(self, rows, seconds):
+        self.advance(seconds.max())
+        bucket = (seconds // self.width).astype(np.int64)
+        keep = bucket > self.head - self.n_buckets
+        np.add.at(self.buckets, (rows[keep], bucket[keep] % self.n_buckets), 1.0)
+        np.add.at(self.totals, rows[keep], 1.0)
+
+
+class SocialAggregator:
+    """Streaming per-ticker social signals: windowed mentions, sentiment EMAs, bursts.
+
+    Sentiment EMAs are time-decayed weighted means kept as two sums
+    rescaled to a shared reference time. A batch of posts is then a pair of
+    np.add.at calls, and the EMA is the ratio of the sums, with no per-post
+    recursion. Row 0 aggregates every post.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self._rows = {SOCIAL_ALL: 0}
+        self.windows = {label: RollingCounts(span, n, capacity) for label, (span, n) in SOCIAL_WINDOWS.items()}
+        self._ema_num = {name: np.zeros(capacity) for name in SOCIAL_EMA_HALF_LIVES}
+        self._ema_den = {name: np.zeros(capacity) for name in SOCIAL_EMA_HALF_LIVES}
+        self._t0 = None
+        self._recent = {}
+        self._offsets = {}
+        self._lock = threading.Lock()
+
+    def _row(self, ticker: str):
+        row = self._rows.get(ticker)
+        if row is None:
+            row = self._rows[ticker] = len(self._rows)
+            capacity = len(self.windows["1h"].totals)
+            if row >= capacity:
+                for window in self.windows.values():
+                    window.grow(2 * capacity)
+                for sums in (self._ema_num, self._ema_den):
+                    for name in sums:
+                        sums[name] = np.append(sums[name], np.zeros(capacity))
+        return row
+
+    def _rebase(self, t: float):
+        """Move the EMA reference time forward before the rescaled weights overflow."""
+        if self._t0 is None:
+            self._t0 = t
+            return
+        shortest = min(SOCIAL_EMA_HALF_LIVES.values())
+        if (t - self._t0) / shortest < 500:
+            return
+        for name, half_life in SOCIAL_EMA_HALF_LIVES.items():
+            factor = np.exp2(-(t - self._t0) / half_life)
+            self._ema_num[name] *= factor
+            self._ema_den[name] *= factor
+        self._t0 = t
+
+    def extend(self, posts):
+        """Score and aggregate new posts (dicts shaped like get_demo_social_signals items)."""
+        posts = sorted(posts, key=lambda post: post["time"])
+        if not posts:
+            return
+        scores = score_texts([post["text"] for post in posts])
+        with self._lock:
+            rows = np.array([self._row(post["ticker"]) for post in posts], dtype=np.int64)
+            seconds = np.array([post["time"].timestamp() for post in posts])
+            both = np.concatenate([rows, np.zeros(len(rows), dtype=np.int64)])
+            both_seconds = np.concatenate([seconds, seconds])
+            for window in self.windows.values():
+                window.add(both, both_seconds)
+
+            self._rebase(seconds.max())
+            for name, half_life in SOCIAL_EMA_HALF_LIVES.items():
+                weight = np.exp2((seconds - self._t0) / half_life)
+                np.add.at(self._ema_num[name], both, np.concatenate([weight * scores] * 2))
+                np.add.at(self._ema_den[name], both, np.concatenate([weight] * 2))
+
+            for post, score in zip(posts, scores):
+                post["sentiment_score"] = float(score)
+                post["sentiment"] = sentiment_label(score)
+                for key in (post["ticker"], SOCIAL_ALL):
+                    recent = self._recent.get(key)
+                    if recent is None:
+                        recent = self._recent[key] = deque(maxlen=SOCIAL_RECENT_POSTS)
+                    recent.appendleft(post)
+
+    def replay(self, path: str):
+        """Aggregate posts appended to the JSONL replay file since the last call."""
+        records, self._offsets[path] = read_jsonl_since(path, self._offsets.get(path, 0))
+        for post in records:
+            post["time"] = datetime.fromisoformat(post["time"])
+        self.extend(records)
+        return len(records)
+
+    def _advance(self, now: datetime):
+        now_seconds = now.timestamp()
+        for window in self.windows.values():
+            window.advance(now_seconds)
+
+    def signal(self, ticker: str = SOCIAL_ALL, now: datetime = None):
+        """Mention counts, sentiment EMAs, burst score and latest posts for one ticker, in O(1)."""
+        now = datetime.utcnow() if now is None else now
+        with self._lock:
+            self._advance(now)
+            row = self._rows.get(ticker)
+            mentions = {label: 0 if row is None else int(w.totals[row]) for label, w in self.windows.items()}
+            ema = {
+                name: float(self._ema_num[name][row] / self._ema_den[name][row])
+                if row is not None and self._ema_den[name][row] > 0
+                else 0.0
+                for name in SOCIAL_EMA_HALF_LIVES
+            }
+            recent = list(self._recent.get(ticker, ()))
+        # Burst: last hour against the hourly rate over the rest of the week (Poisson z-score).
+        baseline = (mentions["7d"] - mentions["1h"]) / (SOCIAL_WINDOWS["7d"][0] / 3600 - 1)
+        burst_z = (mentions["1h"] - baseline) / np.sqrt(baseline + 1.0)
+        return {
+            "ticker": ticker,
+            "mentions": mentions,
+            "ema": ema,
+            "label": sentiment_label(ema["fast"]),
+            "burst_z": float(burst_z),
+            "is_burst": bool(burst_z >= SOCIAL_BURST_Z and mentions["1h"] >= SOCIAL_BURST_MIN_MENTIONS),
+            "recent": recent,
+        }
+
+    def top_tickers(self, k: int = 4, window: str = "24h", now: datetime = None):
+        """The `k` most-mentioned tickers over `window`."""
+        now = datetime.utcnow() if now is None else now
+        with self._lock:
+            self._advance(now)
+            tickers = list(self._rows)[1:]
+            totals = self.windows[window].totals[1 : len(self._rows)]
+        if not tickers:
+            return []
+        order = np.argsort(-totals, kind="stable")[:k]
+        return [tickers[i] for i in order if totals[i] > 0]
+
+
+@st.cache_resource
+def _open_social_aggregator(replay_path: str):
+    aggregator = SocialAggregator()
+    aggregator.extend([dict(post) for post in get_market_data_provider().social()])
+    if SOCIAL_DEMO_BACKLOG:
+        # The demo backlog is dated relative to when it was written, so once its newest post has
+        # aged out of the widest window every count reads zero; start a fresh one instead.
+        newest = last_jsonl_time(replay_path)
+        widest = max(span for span, _ in SOCIAL_WINDOWS.values())
+        if newest is None or (datetime.utcnow() - newest).total_seconds() > widest:
+            if os.path.exists(replay_path):
+                os.remove(replay_path)
+            write_jsonl_stream(replay_path, get_demo_social_stream(SOCIAL_DEMO_BACKLOG))
+    return aggregator
+
+
+def format_age(delta: timedelta):
+    minutes = int(delta.total_seconds() // 60)
+    if minutes < 60:
+        return f"{max(minutes, 0)}m ago"
+    if minutes < 24 * 60:
+        return f"{minutes // 60}h ago"
+    return f"{minutes // (24 * 60)}d ago"
+
+
+def _replay_social():
+    aggregator = _open_social_aggregator(SOCIAL_REPLAY_PATH)
+    aggregator.replay(SOCIAL_REPLAY_PATH)
+    return aggregator
+
+
+def get_social_aggregator():
+    """Shared aggregator; the refresh scheduler catches it up with the replay file in the background."""
+    return get_refresh_scheduler().read("social")
+
+
+# -----------------------------------------------------------------------------
+# Concurrent View Loading
+# -----------------------------------------------------------------------------
+
+LOADER_MAX_WORKERS = 8
+LOADER_TIMEOUT_SECONDS = 2.0
+
+
+@st.cache_resource
+def get_loader_pool():
+    """Thread pool shared by every session for view data loads."""
+    return ThreadPoolExecutor(max_workers=LOADER_MAX_WORKERS, thread_name_prefix="qf-load")
+
+
+def _run_load_task(name: str, ctx, fn, args):
+    # Attach the session's script context so st.cache_* and session state
+    # behave as they would on the script thread.
+    thread = threading.current_thread()
+    previous = None
+    if ctx is not None:
+        previous = getattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+        add_script_run_ctx(thread, ctx)
+    try:
+        inject_latency(name)
+        return fn(*args)
+    finally:
+        if ctx is not None:
+            # add_script_run_ctx(thread, None) would re-attach the current ctx;
+            # restore the pool thread's own so it does not pin this session.
+            setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, previous)
+
+
+def load_concurrently(tasks, timeouts=None, fallbacks=None, default_timeout: float = LOADER_TIMEOUT_SECONDS):
+    """Start every `tasks[name] = (fn, *args)` at once and collect them as (results, failed).
+
+    View latency becomes the slowest call rather than the sum. A call that
+    raises, or is still running when its timeout (measured from the common
+    start) runs out, yields `fallbacks[name]` (default None) and is listed in
+    `failed` with the reason, so the view can render what did arrive. Late
+    calls finish in the background and are discarded.
+    """
+    timeouts = timeouts or {}
+    fallbacks = fallbacks or {}
+    ctx = get_script_run_ctx() if get_script_run_ctx is not None else None
+    pool = get_loader_pool()
+    start = time.monotonic()
+    futures = {name: pool.submit(_run_load_task, name, ctx, task[0], task[1:]) for name, task in tasks.items()}
+    results, failed = {}, {}
+    for name, future in futures.items():
+        remaining = start + timeouts.get(name, default_timeout) - time.monotonic()
+        try:
+            results[name] = future.result(timeout=max(remaining, 0.0))
+        except FuturesTimeoutError:
+            results[name] = fallbacks.get(name)
+            failed[name] = "timeout"
+        except Exception as exc:
+            results[name] = fallbacks.get(name)
+            failed[name] = repr(exc)
+    return results, failed
+
+
+# -----------------------------------------------------------------------------
+# Background Refresh (stale-while-revalidate for shared data)
+# -----------------------------------------------------------------------------
+
+# Seconds between refreshes per job; override with e.g.
+# QF_REFRESH_SECONDS="snapshot=30,news=5" (or "*=10" for all). Screener jobs
+# share one interval.
+_REFRESH_DEFAULTS = {"snapshot": 60.0, "price_history": 300.0, "screener": 240.0, "news": 15.0, "social": 15.0}
+_REFRESH_OVERRIDES = parse_named_spec(os.environ.get("QF_REFRESH_SECONDS", ""))
+REFRESH_INTERVALS = {name: _REFRESH_OVERRIDES.get("*", seconds) for name, seconds in _REFRESH_DEFAULTS.items()}
+REFRESH_INTERVALS.update((name, seconds) for name, seconds in _REFRESH_OVERRIDES.items() if name in _REFRESH_DEFAULTS)
+# Jobs nobody has read for this long stop refreshing until the next read.
+REFRESH_IDLE_SECONDS = 900.0
+# Per-profile screener jobs unread for this long are dropped with their tables.
+REFRESH_EXPIRE_SECONDS = 3600.0
+
+
+class RefreshScheduler:
+    """Keeps shared data fresh on one daemon thread, off every session's rerun.
+
+    Each named job runs at its interval and keeps its last good value.
+    `read` always returns that value at once; if it is older than the
+    interval the job is moved to the front of the queue, so a stale read
+    never waits for the refresh it causes. Only the very first read of a job
+    runs it inline. A job that raises keeps serving its previous value and is
+    retried at the next interval, and jobs left unread for
+    REFRESH_IDLE_SECONDS go quiet until someone reads them again. Jobs
+    registered with `expire_after` are dropped, value included, once unread
+    for that long. With nothing due, the thread sleeps until woken.
+    """
+
+    def __init__(self, idle_seconds: float = REFRESH_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._jobs = {}
+        self._values = {}
+        self._errors = {}
+        self._due = {}
+        self._last_read = {}
+        self._job_locks = {}
+        self._expire_after = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def register(self, name: str, fn, interval: float, *args, expire_after: float = None):
+        """Add job `name` calling `fn(*args)`, dropped after `expire_after` unread seconds if given.
+
+        Registering an existing name only counts as a use of an expiring job,
+        so it cannot expire between its registration and the read that follows.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if name not in self._jobs:
+                self._jobs[name] = (fn, args, interval)
+                self._job_locks[name] = threading.Lock()
+                self._due[name] = now + interval
+                # A job nobody ever reads goes idle REFRESH_IDLE_SECONDS after registration.
+                self._last_read[name] = now
+                if expire_after is not None:
+                    self._expire_after[name] = expire_after
+                self._wake.set()
+            elif name in self._expire_after:
+                self._last_read[name] = now
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="qf-refresh", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                for name, ttl in list(self._expire_after.items()):
+                    if now - self._last_read[name] >= ttl and not self._job_locks[name].locked():
+                        self._unregister(name)
+                active = [name for name in self._jobs if now - self._last_read[name] < self.idle_seconds]
+                due = [name for name in active if self._due[name] <= now]
+            for name in sorted(due, key=self._due.get):
+                self.refresh(name)
+            with self._lock:
+                # Idle jobs keep a past _due, so only active ones (and pending
+                # expiries) set the next wake-up; read() wakes the loop otherwise.
+                wake_at = [self._due[name] for name in active if name in self._due]
+                wake_at += [self._last_read[name] + ttl for name, ttl in self._expire_after.items()]
+            timeout = max(min(wake_at) - time.monotonic(), 0.05) if wake_at else None
+            self._wake.wait(timeout=timeout)
+            self._wake.clear()
+
+    def _unregister(self, name: str):
+        for table in (self._jobs, self._values, self._errors, self._due, self._last_read, self._job_locks):
+            table.pop(name, None)
+        self._expire_after.pop(name, None)
+
+    def refresh(self, name: str):
+        """Run job `name` now on the calling thread, unless it is already running."""
+        job_lock = self._job_locks[name]
+        if job_lock.acquire(blocking=False):
+            try:
+                self._run(name)
+            finally:
+                job_lock.release()
+
+    def _run(self, name: str):
+        fn, args, interval = self._jobs[name]
+        try:
+            value = fn(*args)
+        except Exception as exc:
+            with self._lock:
+                if name in self._jobs:
+                    self._errors[name] = repr(exc)
+        else:
+            with self._lock:
+                if name in self._jobs:
+                    self._values[name] = (value, time.monotonic())
+                    self._errors.pop(name, None)
+        finally:
+            with self._lock:
+                if name in self._jobs:
+                    self._due[name] = time.monotonic() + interval
+
+    def read(self, name: str):
+        """Last good value of job `name`, scheduling an early refresh if it is stale."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_read[name] >= self.idle_seconds:
+                # Back from idle: the loop may be asleep with nothing else due.
+                self._wake.set()
+            self._last_read[name] = now
+            entry = self._values.get(name)
+            if entry is not None and now - entry[1] > self._jobs[name][2]:
+                self._due[name] = now
+                self._wake.set()
+        if entry is not None:
+            return entry[0]
+        # Cold start: load inline, or wait for a load another session started.
+        with self._job_locks[name]:
+            if name not in self._values:
+                self._run(name)
+        with self._lock:
+            if name not in self._values:
+                raise RuntimeError(f"{name}: {self._errors[name]}")
+            return self._values[name][0]
+
+    def status(self):
+        """Per-job age, interval and last error, for diagnostics."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "age_seconds": now - self._values[name][1] if name in self._values else None,
+                    "interval_seconds": interval,
+                    "running": self._job_locks[name].locked(),
+                    "error": self._errors.get(name),
+                }
+                for name, (_, _, interval) in self._jobs.items()
+            }
+
+
+def _refresh_price_history():
+    store = _open_price_history_store(_today_key())
+    # Compute the day's risk metrics before readers switch to the new store.
+    _risk_table_for(store.path)
+    return store
+
+
+@st.cache_resource
+def get_refresh_scheduler():
+    """Process-wide scheduler for the snapshot, history store, news and social feeds."""
+    scheduler = RefreshScheduler()
+    scheduler.register("snapshot", lambda: get_market_data_provider().snapshot(), REFRESH_INTERVALS["snapshot"])
+    scheduler.register("price_history", _refresh_price_history, REFRESH_INTERVALS["price_history"])
+    scheduler.register("news", _ingest_news, REFRESH_INTERVALS["news"])
+    scheduler.register("social", _replay_social, REFRESH_INTERVALS["social"])
+    scheduler.start()
+    return scheduler
+
+
+# -----------------------------------------------------------------------------
+# Chart Downsampling
+# -----------------------------------------------------------------------------
+
+# Approximate plot widths in CSS pixels; charts never get more points than
+# the pixels they are drawn on.
+CHART_WIDTH_PX = 1100
+MINI_CHART_WIDTH_PX = 360
+ASSET_CHART_RANGES = {"3M": 91, "1Y": BARS_PER_YEAR, "5Y": 5 * BARS_PER_YEAR, "Max": None}
+
+
+def _as_float_axis(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").view(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out: int):
+    """Largest-triangle-three-buckets: indices of `n_out` points that keep the visual shape."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float_axis(x)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    next_hi = np.append(edges[2:], n)
+    # Bucket means of the following bucket only depend on the edges, so
+    # compute them all up front from cumulative sums.
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    counts = next_hi - edges[1:]
+    avg_x = (cx[next_hi] - cx[edges[1:]]) / counts
+    avg_y = (cy[next_hi] - cy[edges[1:]]) / counts
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i] - y[a]))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+
+def minmax_indices(y, n_out: int):
+    """Min/max envelope: the lowest and highest point of each bucket, plus both endpoints."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    width = -(-n // ((n_out - 2) // 2))
+    n_buckets = -(-n // width)
+    padded = np.full(n_buckets * width, np.inf)
+    padded[:n] = y
+    lows = padded.reshape(n_buckets, width).argmin(axis=1)
+    padded[n:] = -np.inf
+    highs = padded.reshape(n_buckets, width).argmax(axis=1)
+    offsets = np.arange(n_buckets) * width
+    return np.unique(np.concatenate(([0, n - 1], offsets + lows, offsets + highs)))
+
+
+def downsample_series(x, y, max_points: int, method: str = "lttb"):
+    """(x, y) reduced to at most ~`max_points` points, dropping missing values first."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    finite = np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    if len(y) <= max_points:
+        return x, y
+    idx = minmax_indices(y, max_points) if method == "minmax" else lttb_indices(x, y, max_points)
+    return x[idx], y[idx]
+
+
+# -----------------------------------------------------------------------------
+# Figure Factory
+# -----------------------------------------------------------------------------
+
+FIGURE_CACHE_TTL_SECONDS = 3600.0
+GRID_COLOR = "rgba(55,65,81,0.5)"
+BUY_COLOR = "#22c55e"
+SELL_COLOR = "#f97373"
+HOLD_COLOR = "#e5e7eb"
+
+
+class FrozenFigure(go.Figure):
+    """go.Figure whose spec can be captured once with freeze().
+
+    Afterwards to_dict(), which st.plotly_chart calls on every render and the
+    figure cache sizes entries by, returns the captured spec instead of
+    deep-copying the figure. Frozen figures are shared; never mutate them.
+    """
+
+    _spec = None
+
+    def freeze(self):
+        self._spec = super().to_dict()
+        return self
+
+    def to_dict(self):
+        return super().to_dict() if self._spec is None else self._spec
+
+
+@st.cache_resource
+def get_plotly_template():
+    """Dark dashboard theme, built once and shared by every figure."""
+    return go.layout.Template(
+        layout=dict(
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(15,23,42,1)",
+            font=dict(color="#e5e7eb"),
+            margin=dict(l=0, r=0, t=10, b=20),
+            xaxis=dict(showgrid=False),
+            yaxis=dict(showgrid=True, gridcolor=GRID_COLOR),
+        )
+    )
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Built figures keyed by (builder, content hash of inputs), shared across sessions."""
+    return CacheNamespace(get_shared_cache(), "figures", FIGURE_CACHE_TTL_SECONDS)
+
+
+def _fingerprint_into(h, obj):
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode("utf-8"))
+    elif isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        names = list(obj.columns) if isinstance(obj, pd.DataFrame) else [obj.name]
+        h.update(f"{type(obj).__name__}:{names!r}:{len(obj)};".encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(obj, index=not isinstance(obj, pd.Index)).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"ndarray:{obj.dtype.str}:{obj.shape};".encode("utf-8"))
+        if obj.dtype == object:
+            h.update(pd.util.hash_array(obj.ravel()).tobytes())
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for key in sorted(obj):
+            _fingerprint_into(h, key)
+            _fingerprint_into(h, obj[key])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            _fingerprint_into(h, item)
+        h.update(b"]")
+    else:
+        h.update(f"{type(obj).__name__}:{obj!r};".encode("utf-8"))
+
+
+def figure_fingerprint(*parts) -> str:
+    """Content hash of figure inputs: arrays by value, everything else by repr."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _fingerprint_into(h, part)
+    return h.hexdigest()
+
+
+def cached_figure(builder, *args, **options):
+    """`builder(*args, **options)`, reused while its inputs hash the same.
+
+    Cached figures are shared, so callers must hand them to st.plotly_chart
+    as-is rather than mutating them.
+    """
+    cache = get_figure_cache()
+    key = (builder.__name__, figure_fingerprint(args, options))
+    fig = cache.get(key)
+    if fig is None:
+        fig = builder(*args, **options).freeze()
+        cache.set(key, fig)
+    return fig
+
+
+def build_line_figure(
+    x, y, name: str, height: int, title: str = None, max_points: int = CHART_WIDTH_PX, method: str = "lttb"
+):
+    x, y = downsample_series(x, y, max_points, method=method)
+    fig = FrozenFigure(go.Scatter(x=x, y=y, mode="lines", name=name))
+    layout = dict(template=get_plotly_template(), height=height, showlegend=False)
+    if title is not None:
+        layout["title"] = dict(text=title, font=dict(size=11), x=0.5, xanchor="center")
+        layout["margin"] = dict(l=0, r=0, t=20, b=20)
+    fig.update_layout(**layout)
+    return fig
+
+
+def build_allocation_pie(labels, values):
+    fig = FrozenFigure(go.Pie(labels=labels, values=values, hole=0.55))
+    fig.update_layout(
+        template=get_plotly_template(),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=260,
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5),
+    )
+    return fig
+
+
+def build_allocation_bars(labels, current, proposed):
+    fig = FrozenFigure()
+    fig.add_trace(go.Bar(x=labels, y=current, name="Current"))
+    fig.add_trace(go.Bar(x=labels, y=proposed, name="Model"))
+    fig.update_layout(
+        template=get_plotly_template(),
+        barmode="group",
+        margin=dict(l=0, r=0, t=10, b=40),
+        height=260,
+    )
+    return fig
+
+
+CALL_MARKERS = {
+    "BUY": ("circle", BUY_COLOR),
+    "SELL": ("triangle-up", SELL_COLOR),
+    "HOLD": ("diamond", HOLD_COLOR),
+}
+
+
+def nearest_indices(sorted_dates, targets):
+    """Index of the nearest entry of `sorted_dates` for every target (ties go left)."""
+    sorted_dates = np.asarray(sorted_dates)
+    targets = np.asarray(targets, dtype=sorted_dates.dtype)
+    if len(sorted_dates) < 2:
+        return np.zeros(len(targets), dtype=np.int64)
+    right = np.clip(np.searchsorted(sorted_dates, targets), 1, len(sorted_dates) - 1)
+    left = right - 1
+    go_left = (targets - sorted_dates[left]) <= (sorted_dates[right] - targets)
+    return np.where(go_left, left, right)
+
+
+def build_call_markers(past_dates, past_prices, calls):
+    """One marker trace per action, each call pinned to its nearest price bar."""
+    call_dates = pd.to_datetime(calls["date"]).to_numpy(dtype="datetime64[ns]")
+    at = nearest_indices(past_dates, call_dates)
+    actions = calls["action"].to_numpy()
+    customdata = np.empty((len(calls), 3), dtype=object)
+    customdata[:, 0] = pd.to_datetime(calls["date"]).dt.strftime("%Y-%m-%d").to_numpy()
+    customdata[:, 1] = calls["model_score"].to_numpy(dtype=np.float64)
+    customdata[:, 2] = calls["realized_return_pct"].to_numpy(dtype=np.float64)
+    traces = []
+    for action, (symbol, color) in CALL_MARKERS.items():
+        mask = actions == action
+        if not mask.any():
+            continue
+        traces.append(
+            go.Scatter(
+                x=past_dates[at[mask]],
+                y=past_prices[at[mask]],
+                mode="markers",
+                marker=dict(symbol=symbol, size=9, color=color),
+                name=f"{action} call",
+                customdata=customdata[mask],
+                hovertemplate=(
+                    f"%{{customdata[0]}} – {action}<br>Score %{{customdata[1]:+.2f}}"
+                    "<br>Realized %{customdata[2]:+.2f}%<extra></extra>"
+                ),
+                showlegend=False,
+            )
+        )
+    return traces
+
+
+def build_asset_chart(past_dates, past_prices, calls=None, forecast=None, max_points: int = CHART_WIDTH_PX):
+    """Price path with optional past model calls and forecast band."""
+    fig = FrozenFigure()
+    line_dates, line_prices = downsample_series(past_dates, past_prices, max_points)
+    fig.add_trace(go.Scatter(x=line_dates, y=line_prices, mode="lines", name="Price (demo)"))
+
+    if calls is not None:
+        for trace in build_call_markers(past_dates, past_prices, calls):
+            fig.add_trace(trace)
+
+    if forecast is not None:
+        fig.add_trace(
+            go.Scatter(
+                x=forecast["date"],
+                y=forecast["center"],
+                mode="lines",
+                name="Model forecast",
+                line=dict(dash="dash"),
+            )
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=list(forecast["date"]) + list(forecast["date"][::-1]),
+                y=list(forecast["high"]) + list(forecast["low"][::-1]),
+                fill="toself",
+                fillcolor="rgba(129,140,248,0.25)",
+                line=dict(color="rgba(129,140,248,0)"),
+                name="Forecast band",
+                showlegend=True,
+            )
+        )
+
+    fig.update_layout(template=get_plotly_template(), height=320)
+    return fig
+
+
 # -----------------------------------------------------------------------------
 # Navigation Helpers
 # -----------------------------------------------------------------------------
@@ -519,6 +3641,7 @@ def set_page(view: str, main_tab: str = None, ticker: str = None):
     st.session_state["selected_ticker"] = ticker
 
 
+@profiled
 def render_sidebar():
     with st.sidebar:
         st.markdown("### QuantumFlow")
@@ -526,15 +3649,7 @@ def render_sidebar():
             "<span style='font-size: 11px; color: #9ca3af;'>AI-guided investing</span>",
             unsafe_allow_html=True,
         )
-        # Search
-        search_val = st.text_input("🔍 Search ticker", value="", placeholder="e.g. NVDA, BTC-USD")
-        if st.button("Go", key="sidebar_search_btn"):
-            t = search_val.strip().upper()
-            if t in AVAILABLE_TICKERS:
-                set_page("ASSET_DETAIL", ticker=t)
-                rerun_app()
-            else:
-                st.warning("Ticker not found in this MVP universe.")
+        render_symbol_search()
 
         # Investment profile controls
         with st.expander("👤 My Investment Profile", expanded=True):
@@ -566,6 +3681,31 @@ def render_sidebar():
             )
 
 
+@fragment
+@profiled
+def render_symbol_search():
+    search_val = st.text_input(
+        "🔍 Search ticker or company",
+        value="",
+        placeholder="e.g. NVDA, Apple, BTC",
+        key="sidebar_search",
+    )
+    index = get_symbol_index()
+    suggestions = index.search(search_val)
+    for t, name in suggestions:
+        if st.button(f"{t} · {name}", key=f"sidebar_suggest_{t}", use_container_width=True):
+            set_page("ASSET_DETAIL", ticker=t)
+            rerun_app()
+    if st.button("Go", key="sidebar_search_btn"):
+        t = index.resolve(search_val) or (suggestions[0][0] if suggestions else None)
+        if t is not None:
+            set_page("ASSET_DETAIL", ticker=t)
+            rerun_app()
+        else:
+            st.warning("No matching symbol in this MVP universe.")
+
+
+@profiled
 def render_top_header():
     col1, col2 = st.columns([3, 1])
     with col1:
@@ -583,6 +3723,7 @@ def render_top_header():
         )
 
 
+@profiled
 def render_main_nav():
     st.markdown("---")
     col1, col2, col3 = st.columns(3)
@@ -622,6 +3763,7 @@ def render_main_nav():
 # Investment Profile Summary (top of HOME + inline string)
 # -----------------------------------------------------------------------------
 
+@profiled
 def render_investment_profile_summary_card():
     risk = st.session_state["risk_profile"]
     capital = st.session_state["invest_capital"]
@@ -653,6 +3795,7 @@ def render_investment_profile_summary_card():
     )
 
 
+@profiled
 def render_investment_profile_summary_inline():
     risk = st.session_state["risk_profile"]
     capital = st.session_state["invest_capital"]
@@ -664,8 +3807,9 @@ def render_investment_profile_summary_inline():
 # HOME – Portfolio, Optimal Allocation, Top Picks, Watchlist, Snapshot
 # -----------------------------------------------------------------------------
 
+@profiled
 def render_portfolio_hero():
-    df_portfolio, total_value = compute_portfolio_from_state()
+    ledger = get_holdings_ledger()
 
     st.markdown(
         '<div class="qf-section-title">My Portfolio & Optimal Allocation</div>',
@@ -678,97 +3822,74 @@ def render_portfolio_hero():
         unsafe_allow_html=True,
     )
 
-    if df_portfolio.empty:
+    if ledger.size == 0:
         st.info("No positions yet. Add at least one position to see allocation and optimization.")
         return
 
     # Top row: performance chart + current allocation pie
     top_left, top_right = st.columns([2.1, 1.9])
-
     with top_left:
-        df_ts = get_portfolio_timeseries()
-        toggle = st.radio(
-            "Metric",
-            options=["Value", "% Return"],
-            horizontal=True,
-            key="portfolio_metric_radio",
-        )
-        base_value = df_ts["value"].iloc[0]
-        if toggle == "% Return":
-            y = (df_ts["value"] / base_value - 1) * 100
-            y_label = "% Return"
-        else:
-            y = df_ts["value"]
-            y_label = "Portfolio value"
-
-        fig = go.Figure()
-        fig.add_trace(
-            go.Scatter(
-                x=df_ts["date"],
-                y=y,
-                mode="lines",
-                name=y_label,
-            )
-        )
-        fig.update_layout(
-            margin=dict(l=0, r=0, t=10, b=20),
-            height=260,
-            showlegend=False,
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(15,23,42,1)",
-            font=dict(color="#e5e7eb"),
-        )
-        fig.update_xaxes(showgrid=False)
-        fig.update_yaxes(showgrid=True, gridcolor="rgba(55,65,81,0.5)")
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown(
-            '<div style="font-size: 11px; color: #6b7280; margin-top: 4px;">'
-            "Simulation only. Model-driven insight, not investment advice."
-            "</div>",
-            unsafe_allow_html=True,
-        )
-
+        render_portfolio_chart()
     with top_right:
-        st.markdown(
-            '<div style="font-size: 13px; color: #9ca3af;">Current portfolio allocation</div>',
-            unsafe_allow_html=True,
-        )
-        fig_curr = go.Figure(
-            data=[
-                go.Pie(
-                    labels=df_portfolio["ticker"],
-                    values=df_portfolio["weight_pct"],
-                    hole=0.55,
-                )
-            ]
-        )
-        fig_curr.update_layout(
-            margin=dict(l=0, r=0, t=0, b=0),
-            height=260,
-            showlegend=True,
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(15,23,42,1)",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.1,
-                xanchor="center",
-                x=0.5,
-                font=dict(color="#e5e7eb"),
-            ),
-        )
-        st.plotly_chart(fig_curr, use_container_width=True)
-        top_holdings = df_portfolio.sort_values("weight_pct", ascending=False).head(3)
-        txt = ", ".join(
-            f"{row['ticker']} {row['weight_pct']:.1f}%" for _, row in top_holdings.iterrows()
-        )
-        st.markdown(
-            f'<div style="font-size: 11px; color: #9ca3af;">Top holdings: {txt}</div>',
-            unsafe_allow_html=True,
-        )
+        render_current_allocation()
 
     # Below: optimal allocation comparison + simulation
     st.markdown("")
+    render_allocation_comparison()
+
+
+@fragment
+@profiled
+def render_portfolio_chart():
+    df_ts, left_out = get_portfolio_history()
+    toggle = st.radio(
+        "Metric",
+        options=["Value", "% Return"],
+        horizontal=True,
+        key="portfolio_metric_radio",
+    )
+    if toggle == "% Return":
+        y = df_ts["return_pct"]
+        y_label = "% Return"
+    else:
+        y = df_ts["value"]
+        y_label = "Portfolio value"
+
+    fig = cached_figure(build_line_figure, df_ts["date"].to_numpy(), y.to_numpy(), name=y_label, height=260)
+    st.plotly_chart(fig, use_container_width=True)
+    if left_out:
+        more = f" and {len(left_out) - 5} more" if len(left_out) > 5 else ""
+        st.caption(f"No price history for {', '.join(left_out[:5])}{more}; not included in this chart.")
+    st.markdown(
+        '<div style="font-size: 11px; color: #6b7280; margin-top: 4px;">'
+        "Simulation only. Model-driven insight, not investment advice."
+        "</div>",
+        unsafe_allow_html=True,
+    )
+
+
+@profiled
+def render_current_allocation():
+    tickers, current_weights = get_holdings_ledger().ticker_weights()
+    st.markdown(
+        '<div style="font-size: 13px; color: #9ca3af;">Current portfolio allocation</div>',
+        unsafe_allow_html=True,
+    )
+    fig_curr = cached_figure(build_allocation_pie, tickers, current_weights)
+    st.plotly_chart(fig_curr, use_container_width=True)
+    top_holdings = np.argsort(-current_weights, kind="stable")[:3]
+    txt = ", ".join(f"{tickers[i]} {current_weights[i]:.1f}%" for i in top_holdings)
+    st.markdown(
+        f'<div style="font-size: 11px; color: #9ca3af;">Top holdings: {txt}</div>',
+        unsafe_allow_html=True,
+    )
+
+
+@fragment
+@profiled
+def render_allocation_comparison():
+    tickers, current_weights = get_holdings_ledger().ticker_weights()
+
     st.markdown(
         '<div class="qf-section-subtitle" style="margin-bottom: 0.25rem;">'
         "Compare your current allocation to QuantumFlow’s optimal suggestion."
@@ -776,18 +3897,13 @@ def render_portfolio_hero():
         unsafe_allow_html=True,
     )
 
-    tickers = df_portfolio["ticker"].tolist()
-    current_weights = df_portfolio["weight_pct"].values
     risk = st.session_state["risk_profile"]
     horizon = st.session_state["time_horizon"]
 
-    qf_scores = []
-    for t in tickers:
-        d = get_demo_decision(t, risk, horizon)
-        qf_scores.append(max(-1.0, min(1.0, d["composite"])))
-    qf_scores = np.array(qf_scores)
-    shifted = qf_scores - qf_scores.min() + 0.1
-    proposed = shifted / shifted.sum() * 100
+    decisions = get_cached_decisions(tickers, risk, horizon)
+    qf_scores = np.clip([d["composite"] for d in decisions], -1.0, 1.0)
+    proposed = get_optimal_allocation(tickers, qf_scores, current_weights / 100, risk) * 100
+    _, _, covered = get_shrinkage_covariance(tickers)
 
     optimal_df = pd.DataFrame(
         {
@@ -797,28 +3913,11 @@ def render_portfolio_hero():
         }
     )
 
-    fig_opt = go.Figure()
-    fig_opt.add_trace(
-        go.Bar(
-            x=optimal_df["ticker"],
-            y=optimal_df["current_weight_pct"],
-            name="Current",
-        )
-    )
-    fig_opt.add_trace(
-        go.Bar(
-            x=optimal_df["ticker"],
-            y=optimal_df["proposed_weight_pct"],
-            name="Model",
-        )
-    )
-    fig_opt.update_layout(
-        barmode="group",
-        margin=dict(l=0, r=0, t=10, b=40),
-        height=260,
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(15,23,42,1)",
-        font=dict(color="#e5e7eb"),
+    fig_opt = cached_figure(
+        build_allocation_bars,
+        optimal_df["ticker"].to_numpy(),
+        optimal_df["current_weight_pct"].to_numpy(),
+        optimal_df["proposed_weight_pct"].to_numpy(),
     )
     st.plotly_chart(fig_opt, use_container_width=True)
 
@@ -831,6 +3930,10 @@ def render_portfolio_hero():
         """,
         unsafe_allow_html=True,
     )
+    if not covered.all():
+        uncovered = [t for t, ok in zip(tickers, covered) if not ok]
+        more = f" and {len(uncovered) - 5} more" if len(uncovered) > 5 else ""
+        st.caption(f"Not enough price history for {', '.join(uncovered[:5])}{more}: kept at current weight.")
 
     # Differences + simulation
     optimal_df["diff"] = optimal_df["proposed_weight_pct"] - optimal_df["current_weight_pct"]
@@ -853,17 +3956,25 @@ def render_portfolio_hero():
 
     if st.session_state["show_allocation_simulation"]:
         st.markdown("")
-        with st.expander("Simulation – Before vs After (demo)", expanded=True):
+        with st.expander("Simulation – Before vs After", expanded=True):
             sim_df = optimal_df.copy()
             sim_df["current_weight_pct"] = sim_df["current_weight_pct"].round(1)
             sim_df["proposed_weight_pct"] = sim_df["proposed_weight_pct"].round(1)
             st.dataframe(sim_df[["ticker", "current_weight_pct", "proposed_weight_pct"]], hide_index=True)
+            sim = get_allocation_simulation(
+                tickers, current_weights / 100, proposed / 100, MV_RETURN_TILT * qf_scores, horizon
+            )
+            if not covered.all():
+                st.caption("Holdings without enough price history are simulated as cash.")
+            conf = int(MC_CONFIDENCE * 100)
             st.markdown(
-                """
-                *Demo metrics (to be replaced with real risk engine):*  
-                - Expected annualized return: **+12.4% → +14.8%**  
-                - Volatility estimate: **18.1% → 16.9%**  
-                - Max drawdown (simulated): **–22% → –19%**
+                f"""
+                *Monte Carlo over {MC_DEFAULT_PATHS:,} paths, {horizon.lower()} horizon (current → model):*  
+                - Expected return: **{sim['expected_return_pct'][0]:+.1f}% → {sim['expected_return_pct'][1]:+.1f}%**  
+                - Volatility (annualized): **{sim['volatility_pct'][0]:.1f}% → {sim['volatility_pct'][1]:.1f}%**  
+                - VaR {conf}%: **{sim['var_pct'][0]:.1f}% → {sim['var_pct'][1]:.1f}%** · CVaR {conf}%: **{sim['cvar_pct'][0]:.1f}% → {sim['cvar_pct'][1]:.1f}%**  
+                - Max drawdown (median): **{sim['max_drawdown_median_pct'][0]:.1f}% → {sim['max_drawdown_median_pct'][1]:.1f}%**  
+                - Max drawdown (worst {100 - conf}%): **{sim['max_drawdown_tail_pct'][0]:.1f}% → {sim['max_drawdown_tail_pct'][1]:.1f}%**
                 """,
             )
             st.markdown(
@@ -874,6 +3985,8 @@ def render_portfolio_hero():
             )
 
 
+@fragment
+@profiled
 def render_top_picks():
     st.markdown(
         '<div class="qf-section-title">QuantumFlow Top Picks for You</div>',
@@ -889,18 +4002,17 @@ def render_top_picks():
     risk = st.session_state["risk_profile"]
     horizon = st.session_state["time_horizon"]
 
-    rows = []
-    for t in AVAILABLE_TICKERS:
-        d = get_demo_decision(t, risk, horizon)
-        rows.append({"ticker": t, "decision": d})
-    rows = sorted(rows, key=lambda r: r["decision"]["composite"], reverse=True)[:8]
-
-    for r in rows:
-        t = r["ticker"]
-        d = r["decision"]
+    decisions = get_cached_decisions(AVAILABLE_TICKERS, risk, horizon)
+    quotes = get_demo_quotes(AVAILABLE_TICKERS)
+    composite = np.array([d["composite"] for d in decisions])
+    top = np.argsort(-composite, kind="stable")[:8]
+
+    for i in top:
+        t = AVAILABLE_TICKERS[i]
+        d = decisions[i]
         score = d["composite"]
-        price = np.random.uniform(50, 500)
-        daily_pct = np.random.normal(0, 2)
+        price = quotes["price"][i]
+        daily_pct = quotes["daily_pct"][i]
         color = "#4ade80" if daily_pct >= 0 else "#f97373"
         arrow = "▲" if daily_pct >= 0 else "▼"
         sentiment_class = (
@@ -942,6 +4054,8 @@ def render_top_picks():
             rerun_app()
 
 
+@fragment
+@profiled
 def render_watchlist():
     st.markdown(
         '<div class="qf-section-title">My Watchlist</div>',
@@ -966,17 +4080,19 @@ def render_watchlist():
                 watchlist.append(new_ticker)
                 st.session_state["watchlist"] = watchlist
                 st.success(f"{new_ticker} added to watchlist.")
-                rerun_app()
+                rerun_fragment()
         else:
             st.info("All demo tickers are already in your watchlist.")
 
+    decisions = get_cached_decisions(watchlist, risk, horizon)
+    quotes = get_demo_quotes(watchlist)
     cols = st.columns(2)
     for i, t in enumerate(watchlist):
         col = cols[i % 2]
         with col:
-            d = get_demo_decision(t, risk, horizon)
-            price = np.random.uniform(50, 500)
-            daily_pct = np.random.normal(0, 2)
+            d = decisions[i]
+            price = quotes["price"][i]
+            daily_pct = quotes["daily_pct"][i]
             color = "#4ade80" if daily_pct >= 0 else "#f97373"
             arrow = "▲" if daily_pct >= 0 else "▼"
             sentiment_class = (
@@ -1016,6 +4132,8 @@ def render_watchlist():
                 rerun_app()
 
 
+@fragment
+@profiled
 def render_global_snapshot_compact():
     st.markdown(
         '<div class="qf-section-title">Global market snapshot</div>',
@@ -1028,7 +4146,7 @@ def render_global_snapshot_compact():
         unsafe_allow_html=True,
     )
 
-    indices = get_demo_global_market_snapshot()
+    indices = get_refresh_scheduler().read("snapshot")
     cols = st.columns(3)
     for i, item in enumerate(indices[:9]):
         col = cols[i % 3]
@@ -1058,6 +4176,7 @@ def render_global_snapshot_compact():
     )
 
 
+@profiled
 def render_home():
     render_investment_profile_summary_card()
     st.markdown("")
@@ -1078,6 +4197,7 @@ def render_home():
 # ASSET DETAIL – "Ticker Lab"
 # -----------------------------------------------------------------------------
 
+@profiled
 def render_asset_detail():
     ticker = st.session_state.get("selected_ticker")
     if not ticker:
@@ -1087,8 +4207,19 @@ def render_asset_detail():
     risk = st.session_state["risk_profile"]
     horizon = st.session_state["time_horizon"]
     profile_summary = render_investment_profile_summary_inline()
-    decision = get_demo_decision(ticker, risk, horizon)
-    views = decision["expert_views"]
+    data, failed = load_concurrently(
+        {
+            "decision": (get_decision, ticker, risk, horizon),
+            "quote": (get_demo_quotes, [ticker]),
+            "model_history": (get_demo_model_history, ticker),
+            "sentiment": (get_sentiment_summary, ticker),
+            "news": (get_ticker_news, ticker),
+        }
+    )
+    decision = data["decision"]
+    if decision is None or data["quote"] is None:
+        st.warning(f"Market data for {ticker} did not arrive in time. Please try again in a moment.")
+        return
 
     # Header
     st.markdown(
@@ -1105,8 +4236,9 @@ def render_asset_detail():
     top_left, top_right = st.columns([2.5, 2])
 
     with top_left:
-        price = np.random.uniform(80, 500)
-        daily_pct = np.random.normal(0, 2)
+        quote = data["quote"]
+        price = quote["price"][0]
+        daily_pct = quote["daily_pct"][0]
         color = "#4ade80" if daily_pct >= 0 else "#f97373"
         arrow = "▲" if daily_pct >= 0 else "▼"
         st.markdown(
@@ -1159,80 +4291,39 @@ def render_asset_detail():
 
     st.markdown("")
 
-    # Main chart: price + calls + forecast
-    past_df, future_df = get_demo_price_and_forecast_series(ticker)
-    show_forecast = st.checkbox("Show model forecast band", value=True)
-    show_calls = st.checkbox("Show past model calls", value=True)
-
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=past_df["date"],
-            y=past_df["price"],
-            mode="lines",
-            name="Price (demo)",
-        )
-    )
-
-    if show_calls:
-        hist = get_demo_model_history(ticker)
-        for _, row in hist.iterrows():
-            dt = datetime.combine(row["date"], datetime.min.time())
-            closest_idx = (past_df["date"] - dt).abs().idxmin()
-            price_at_call = past_df.loc[closest_idx, "price"]
-            marker_symbol = (
-                "circle"
-                if row["action"] == "BUY"
-                else "triangle-up"
-                if row["action"] == "SELL"
-                else "diamond"
-            )
-            marker_color = (
-                "#22c55e" if row["action"] == "BUY" else "#f97373" if row["action"] == "SELL" else "#e5e7eb"
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=[past_df.loc[closest_idx, "date"]],
-                    y=[price_at_call],
-                    mode="markers",
-                    marker=dict(symbol=marker_symbol, size=9, color=marker_color),
-                    name=f"{row['action']} call",
-                    hovertemplate=f"{row['date']} – {row['action']}<br>Score {row['model_score']:+.2f}<br>Realized {row['realized_return_pct']:+.2f}%<extra></extra>",
-                    showlegend=False,
-                )
-            )
+    render_asset_chart(ticker, data["model_history"])
+    render_asset_tabs(ticker, data)
 
-    if show_forecast:
-        fig.add_trace(
-            go.Scatter(
-                x=future_df["date"],
-                y=future_df["center"],
-                mode="lines",
-                name="Model forecast",
-                line=dict(dash="dash"),
-            )
-        )
-        fig.add_trace(
-            go.Scatter(
-                x=list(future_df["date"]) + list(future_df["date"][::-1]),
-                y=list(future_df["high"]) + list(future_df["low"][::-1]),
-                fill="toself",
-                fillcolor="rgba(129,140,248,0.25)",
-                line=dict(color="rgba(129,140,248,0)"),
-                name="Forecast band",
-                showlegend=True,
-            )
-        )
 
-    fig.update_layout(
-        margin=dict(l=0, r=0, t=10, b=20),
-        height=320,
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(15,23,42,1)",
-        font=dict(color="#e5e7eb"),
+@fragment
+@profiled
+def render_asset_chart(ticker: str, model_history=None):
+    range_label = st.radio(
+        "Range",
+        options=list(ASSET_CHART_RANGES),
+        horizontal=True,
+        key="asset_chart_range",
+    )
+    store = get_price_history_store()
+    n_bars = ASSET_CHART_RANGES[range_label]
+    if ticker in store:
+        past_dates, past_prices = store.window(ticker) if n_bars is None else store.trailing(ticker, n_bars)
+    else:
+        # Long-tail screener symbols are not in the store; read the provider's cached bars.
+        bars = get_market_data_provider().history(ticker, start=HISTORY_EPOCH)
+        past_dates = bars["date"].to_numpy(dtype="datetime64[ns]")[-(n_bars or len(bars)) :]
+        past_prices = bars["close"].to_numpy(dtype=np.float64)[-(n_bars or len(bars)) :]
+    future_df = get_demo_forecast_band(ticker, float(past_prices[-1]))
+    show_forecast = st.checkbox("Show model forecast band", value=True)
+    show_calls = st.checkbox("Show past model calls", value=True, disabled=model_history is None)
+
+    fig = cached_figure(
+        build_asset_chart,
+        past_dates,
+        past_prices,
+        calls=model_history if show_calls else None,
+        forecast=future_df if show_forecast else None,
     )
-    fig.update_xaxes(showgrid=False)
-    fig.update_yaxes(showgrid=True, gridcolor="rgba(55,65,81,0.5)")
     st.plotly_chart(fig, use_container_width=True)
     st.markdown(
         '<div style="font-size: 11px; color: #6b7280;">'
@@ -1241,6 +4332,13 @@ def render_asset_detail():
         unsafe_allow_html=True,
     )
 
+
+@fragment
+@profiled
+def render_asset_tabs(ticker: str, loaded):
+    decision = loaded["decision"]
+    views = decision["expert_views"]
+
     tab1, tab2, tab3 = st.tabs(["QuantumFlow Analysis", "Stats & History", "Sentiment & News"])
 
     with tab1:
@@ -1307,8 +4405,10 @@ def render_asset_detail():
             '<div class="qf-section-title" style="margin-top: 0.75rem;">QuantumFlow call history</div>',
             unsafe_allow_html=True,
         )
-        df_hist = get_demo_model_history(ticker)
-        if not df_hist.empty:
+        df_hist = loaded["model_history"]
+        if df_hist is None:
+            st.info("Model call history is unavailable right now.")
+        elif not df_hist.empty:
             win_rate = df_hist["correct"].mean() * 100
             st.markdown(
                 f'<div class="qf-section-subtitle">Demo hit rate ≈ {win_rate:.1f}% over the last {len(df_hist)} calls.</div>',
@@ -1329,7 +4429,11 @@ def render_asset_detail():
             '<div class="qf-section-title">Sentiment & news</div>',
             unsafe_allow_html=True,
         )
-        summary = get_demo_sentiment_summary(ticker)
+        summary = loaded["sentiment"] or {
+            "score": 0.0,
+            "label": "Unavailable",
+            "text": "The sentiment service did not respond in time.",
+        }
         st.markdown(
             f"""
             <div class="qf-card">
@@ -1353,9 +4457,10 @@ def render_asset_detail():
             unsafe_allow_html=True,
         )
 
-        feed = get_demo_news_feed()
-        related = [item for item in feed if ticker in item["tickers"]]
-        if not related:
+        related = loaded["news"]
+        if related is None:
+            st.info("News is taking longer than usual to load; showing the rest of the page without it.")
+        elif not related:
             st.info("No recent demo stories tied to this ticker yet.")
         else:
             for item in related:
@@ -1397,6 +4502,7 @@ def render_asset_detail():
 # MARKETS – Regime & Risk + Index Charts + Focus Tickers
 # -----------------------------------------------------------------------------
 
+@profiled
 def render_market_regime_overview():
     st.markdown(
         '<div class="qf-section-title">Today’s Market Regime & Risk (demo)</div>',
@@ -1425,16 +4531,24 @@ def render_market_regime_overview():
             unsafe_allow_html=True,
         )
 
+    risk = get_risk_table()
+    market = risk.loc[RISK_BENCHMARK]
+    conf = int(RISK_CONFIDENCE * 100)
+
     with right:
         st.markdown(
-            """
+            f"""
             <div class="qf-card">
-                <div style="font-size: 13px; color: #9ca3af;">Risk dashboard (demo)</div>
+                <div style="font-size: 13px; color: #9ca3af;">Risk dashboard ({RISK_BENCHMARK}, demo data)</div>
                 <div style="font-size: 12px; color: #e5e7eb; margin-top: 4px;">
-                    Fear/Greed: <b>63 / 100</b> – moderate greed<br/>
-                    Market volatility: <b>Medium</b><br/>
-                    Tech bubble signal: <b>Elevated</b><br/>
-                    Overall market VaR: <b>Moderate</b>
+                    Market volatility: <b>{market['vol_level']}</b> – {market['vol_pct']:.1f}% annualized
+                    ({RISK_VOL_WINDOW}d, {market['vol_percentile'] * 100:.0f}th pct of the past year)<br/>
+                    1-day VaR {conf}%: <b>{market['var_hist_pct']:.2f}%</b> historical ·
+                    <b>{market['var_param_pct']:.2f}%</b> parametric<br/>
+                    1-day CVaR {conf}%: <b>{market['cvar_hist_pct']:.2f}%</b> historical ·
+                    <b>{market['cvar_param_pct']:.2f}%</b> parametric<br/>
+                    Max drawdown (1y): <b>{market['max_drawdown_pct']:.1f}%</b> ·
+                    Nasdaq 100 beta: <b>{risk.loc['Nasdaq 100', 'beta']:.2f}</b>
                 </div>
                 <div style="font-size: 11px; color: #9ca3af; margin-top: 6px;">
                     QuantumFlow summary: Markets are somewhat risk-on, but crowded in mega-cap tech.
@@ -1448,41 +4562,43 @@ def render_market_regime_overview():
     st.markdown("")
     # Mini index charts
     c1, c2, c3 = st.columns(3)
+    store = get_price_history_store()
     for col, name in zip([c1, c2, c3], ["S&P 500", "Nasdaq 100", "BTC-USD"]):
+        idx_dates, values = store.trailing(name, 60)
         with col:
-            df_idx = get_demo_index_series(name)
-            fig = go.Figure()
-            fig.add_trace(
-                go.Scatter(
-                    x=df_idx["date"],
-                    y=df_idx["value"],
-                    mode="lines",
-                    name=name,
-                )
-            )
-            fig.update_layout(
-                title=dict(
-                    text=name,
-                    font=dict(size=11, color="#e5e7eb"),
-                    x=0.5,
-                    xanchor="center",
-                ),
-                margin=dict(l=0, r=0, t=20, b=20),
+            fig = cached_figure(
+                build_line_figure,
+                idx_dates,
+                values,
+                name=name,
                 height=180,
-                showlegend=False,
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(15,23,42,1)",
-                font=dict(color="#e5e7eb"),
+                title=name,
+                max_points=MINI_CHART_WIDTH_PX,
+                method="minmax",
             )
-            fig.update_xaxes(showgrid=False)
-            fig.update_yaxes(showgrid=True, gridcolor="rgba(55,65,81,0.5)")
             st.plotly_chart(fig, use_container_width=True)
 
 
+@profiled
 def render_markets():
     render_market_regime_overview()
     st.markdown("")
 
+    mode = st.radio(
+        "Markets view",
+        options=["Focus assets", "Screener"],
+        horizontal=True,
+        key="markets_mode",
+        label_visibility="collapsed",
+    )
+    if mode == "Screener":
+        render_screener()
+    else:
+        render_focus_assets()
+
+
+@profiled
+def render_focus_assets():
     st.markdown(
         '<div class="qf-section-title">Focus assets</div>',
         unsafe_allow_html=True,
@@ -1498,24 +4614,12 @@ def render_markets():
     horizon = st.session_state["time_horizon"]
 
     focus = ["NVDA", "AAPL", "MSFT", "GOOGL", "META", "AMZN", "TSLA", "BTC-USD", "ETH-USD"]
-    data = []
-    for t in focus:
-        price = np.random.uniform(80, 600)
-        daily_pct = np.random.normal(0, 3)
-        vol_level = np.random.choice(["Low", "Medium", "High"], p=[0.3, 0.4, 0.3])
-        d = get_demo_decision(t, risk, horizon)
-        data.append(
-            {
-                "ticker": t,
-                "price": price,
-                "daily_pct": daily_pct,
-                "volatility": vol_level,
-                "action": d["action"],
-                "score": d["composite"],
-            }
-        )
-
-    df = pd.DataFrame(data).sort_values("score", ascending=False)
+    decisions = get_cached_decisions(focus, risk, horizon)
+    df = pd.DataFrame(get_demo_quotes(focus)).rename(columns={"tickers": "ticker"})
+    df["volatility"] = get_risk_table().loc[focus, "vol_level"].to_numpy()
+    df["action"] = [d["action"] for d in decisions]
+    df["score"] = [d["composite"] for d in decisions]
+    df = df.sort_values("score", ascending=False)
 
     for _, row in df.iterrows():
         t = row["ticker"]
@@ -1569,10 +4673,84 @@ def render_markets():
             rerun_app()
 
 
+@fragment
+@profiled
+def render_screener():
+    st.markdown(
+        '<div class="qf-section-title">Screener</div>',
+        unsafe_allow_html=True,
+    )
+    table = get_screener_table(st.session_state["risk_profile"], st.session_state["time_horizon"])
+    st.markdown(
+        '<div class="qf-section-subtitle">'
+        f"All {table.n:,} symbols in the demo universe. Select a row to open its full QuantumFlow analysis."
+        "</div>",
+        unsafe_allow_html=True,
+    )
+
+    c1, c2, c3, c4 = st.columns([1.2, 1.6, 1.6, 1])
+    with c1:
+        prefix = st.text_input("Symbol starts with", value="", key="screener_prefix")
+    with c2:
+        actions = st.multiselect("Action", options=list(DECISION_ACTIONS), key="screener_actions")
+    with c3:
+        volatility = st.multiselect(
+            "Volatility",
+            options=list(VOLATILITY_LEVELS),
+            key="screener_volatility",
+            help="Measured from stored price history; symbols without it (n/a) are left out when filtering.",
+        )
+    with c4:
+        sort_label = st.selectbox("Sort by", options=list(SCREENER_SORT_COLUMNS), key="screener_sort")
+
+    indices = table.query(
+        sort_by=SCREENER_SORT_COLUMNS[sort_label],
+        descending=sort_label != "Ticker",
+        actions=actions,
+        volatility=volatility,
+        prefix=prefix,
+    )
+
+    p1, p2, p3 = st.columns([1, 1, 3])
+    with p1:
+        page_size = st.selectbox("Rows per page", options=SCREENER_PAGE_SIZES, key="screener_page_size")
+    n_pages = max(1, -(-len(indices) // page_size))
+    with p2:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key="screener_page")
+    with p3:
+        st.markdown(
+            f'<div style="font-size: 11px; color: #9ca3af; margin-top: 2.1rem;">'
+            f"{len(indices):,} matches · page {min(page, n_pages)} of {n_pages}</div>",
+            unsafe_allow_html=True,
+        )
+
+    page_df = table.page(indices, min(page, n_pages), page_size)
+    event = st.dataframe(
+        page_df,
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="screener_table",
+        column_config={
+            "ticker": "Ticker",
+            "price": st.column_config.NumberColumn("Price", format="$%.2f"),
+            "daily_pct": st.column_config.NumberColumn("Daily %", format="%+.2f%%"),
+            "volatility": "Volatility",
+            "action": "Action",
+            "score": st.column_config.NumberColumn("Model score", format="%+.2f"),
+        },
+    )
+    if event.selection.rows:
+        set_page("ASSET_DETAIL", ticker=page_df["ticker"].iloc[event.selection.rows[0]])
+        rerun_app()
+
+
 # -----------------------------------------------------------------------------
 # NEWS – Articles + Social Signals
 # -----------------------------------------------------------------------------
 
+@profiled
 def render_news():
     st.markdown(
         '<div class="qf-section-title">Market news & QuantumFlow insights</div>',
@@ -1585,8 +4763,8 @@ def render_news():
         unsafe_allow_html=True,
     )
 
-    feed = get_demo_news_feed()
-    social = get_demo_social_signals()
+    data, failed = load_concurrently({"news": (get_news_store,), "social": (get_social_aggregator,)})
+    news_store, social = data["news"], data["social"]
 
     left, right = st.columns([2, 1.4])
 
@@ -1601,110 +4779,216 @@ def render_news():
             "</div>",
             unsafe_allow_html=True,
         )
-        for i, item in enumerate(feed):
-            ts = item["time"].strftime("%Y-%m-%d %H:%M")
-            sentiment_class = (
-                "qf-pill-positive"
-                if item["sentiment"] == "Positive"
-                else "qf-pill-negative"
-                if item["sentiment"] == "Negative"
-                else "qf-pill-neutral"
-            )
-            st.markdown(
-                f"""
-                <div class="qf-card" style="margin-bottom: 0.6rem;">
-                    <div style="display: flex; justify-content: space-between; align-items: center;">
-                        <div style="font-size: 12px; color: #9ca3af;">
-                            {item['source']} · {ts} UTC
-                        </div>
-                        <span class="qf-pill {sentiment_class}">
-                            Sentiment: {item['sentiment']}
-                        </span>
-                    </div>
-                    <div style="font-size: 14px; font-weight: 600; color: #e5e7eb; margin-top: 4px;">
-                        {item['headline']}
-                    </div>
-                    <div style="font-size: 12px; color: #9ca3af; margin-top: 4px;">
-                        {item['summary']}
-                    </div>
-                    <div style="margin-top: 6px;">
-                        {''.join(f'<span class="qf-ticker-pill">{t}</span>' for t in item['tickers'])}
-                    </div>
-                    <div style="font-size: 12px; color: #e5e7eb; margin-top: 6px;">
-                        <span style="font-weight: 600;">QuantumFlow Insight:</span> {item['insight']}
-                    </div>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+        if news_store is None:
+            st.info("News is taking longer than usual to load; showing social signals only.")
+        else:
+            render_news_articles(news_store)
 
     with right:
         st.markdown(
             '<div class="qf-section-title" style="font-size: 14px;">Social signals (X / Reddit)</div>',
             unsafe_allow_html=True,
         )
-        agg = social["aggregate"]
+        if social is None:
+            st.info("Social signals are taking longer than usual to load.")
+        else:
+            render_social_signals(social)
+
+
+@profiled
+def render_news_articles(news_store):
+    source = st.selectbox("Source", options=["All sources"] + news_store.sources(), key="news_source")
+    feed = news_store.latest(NEWS_PAGE_SIZE, source=None if source == "All sources" else source)
+    for i, item in enumerate(feed):
+        ts = item["time"].strftime("%Y-%m-%d %H:%M")
+        sentiment_class = (
+            "qf-pill-positive"
+            if item["sentiment"] == "Positive"
+            else "qf-pill-negative"
+            if item["sentiment"] == "Negative"
+            else "qf-pill-neutral"
+        )
         st.markdown(
             f"""
-            <div class="qf-card">
-                <div style="font-size: 13px; color: #9ca3af;">Aggregated social sentiment (demo)</div>
-                <div style="font-size: 15px; font-weight: 600; color: #e5e7eb; margin-top: 4px;">
-                    {agg['label']} ({agg['score']:+.2f} on [-1, +1])
+            <div class="qf-card" style="margin-bottom: 0.6rem;">
+                <div style="display: flex; justify-content: space-between; align-items: center;">
+                    <div style="font-size: 12px; color: #9ca3af;">
+                        {item['source']} · {ts} UTC
+                    </div>
+                    <span class="qf-pill {sentiment_class}">
+                        Sentiment: {item['sentiment']}
+                    </span>
+                </div>
+                <div style="font-size: 14px; font-weight: 600; color: #e5e7eb; margin-top: 4px;">
+                    {item['headline']}
                 </div>
                 <div style="font-size: 12px; color: #9ca3af; margin-top: 4px;">
-                    {agg['text']}
+                    {item['summary']}
                 </div>
-                <div style="font-size: 11px; color: #9ca3af; margin-top: 6px;">
-                    {agg['historical']}
+                <div style="margin-top: 6px;">
+                    {''.join(f'<span class="qf-ticker-pill">{t}</span>' for t in item['tickers'])}
+                </div>
+                <div style="font-size: 12px; color: #e5e7eb; margin-top: 6px;">
+                    <span style="font-weight: 600;">QuantumFlow Insight:</span> {item['insight']}
                 </div>
             </div>
             """,
             unsafe_allow_html=True,
         )
 
-        st.markdown("")
+
+@profiled
+def render_social_signals(social):
+    now = datetime.utcnow()
+    agg = social.signal(now=now)
+    leaders = social.top_tickers(now=now)
+    bursts = [t for t in leaders if social.signal(t, now=now)["is_burst"]]
+    if bursts:
+        historical = "Mention bursts in the last hour: " + ", ".join(bursts) + "."
+    else:
+        historical = "No unusual mention bursts in the last hour."
+    st.markdown(
+        f"""
+        <div class="qf-card">
+            <div style="font-size: 13px; color: #9ca3af;">Aggregated social sentiment (1h EMA)</div>
+            <div style="font-size: 15px; font-weight: 600; color: #e5e7eb; margin-top: 4px;">
+                {agg['label']} ({agg['ema']['fast']:+.2f} on [-1, +1])
+            </div>
+            <div style="font-size: 12px; color: #9ca3af; margin-top: 4px;">
+                {agg['mentions']['24h']:,} posts in the last 24h ({agg['mentions']['1h']:,} in the last hour).
+                Most mentioned: {', '.join(leaders) or '–'}.
+            </div>
+            <div style="font-size: 11px; color: #9ca3af; margin-top: 6px;">
+                {historical}
+            </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    st.markdown("")
+    st.markdown(
+        '<div class="qf-section-subtitle" style="margin-bottom: 0.3rem;">'
+        "Most-discussed tickers: mention windows, sentiment trend and the latest post."
+        "</div>",
+        unsafe_allow_html=True,
+    )
+
+    for ticker in leaders:
+        sig = social.signal(ticker, now=now)
+        sentiment_class = (
+            "qf-pill-positive"
+            if sig["label"] == "Positive"
+            else "qf-pill-negative"
+            if sig["label"] == "Negative"
+            else "qf-pill-neutral"
+        )
+        burst = " · <b>burst</b>" if sig["is_burst"] else ""
+        latest = sig["recent"][0] if sig["recent"] else None
+        latest_html = (
+            f"{latest['source']} · {latest['handle']} · {format_age(now - latest['time'])}<br/>{latest['text']}"
+            if latest is not None
+            else ""
+        )
+        mentions = sig["mentions"]
         st.markdown(
-            '<div class="qf-section-subtitle" style="margin-bottom: 0.3rem;">'
-            "Recent demo posts and how similar clusters behaved in the past."
-            "</div>",
+            f"""
+            <div class="qf-card" style="margin-bottom: 0.5rem;">
+                <div style="display: flex; justify-content: space-between; align-items: center;">
+                    <div style="font-size: 12px; color: #9ca3af;">
+                        <span class="qf-ticker-pill">{ticker}</span>
+                        Mentions 1h / 24h / 7d: {mentions['1h']} / {mentions['24h']} / {mentions['7d']}{burst}
+                    </div>
+                    <span class="qf-pill {sentiment_class}">
+                        {sig['label']}
+                    </span>
+                </div>
+                <div style="font-size: 11px; color: #9ca3af; margin-top: 4px;">
+                    Sentiment EMA 1h {sig['ema']['fast']:+.2f} · 24h {sig['ema']['slow']:+.2f}
+                </div>
+                <div style="font-size: 12px; color: #e5e7eb; margin-top: 4px;">
+                    {latest_html}
+                </div>
+            </div>
+            """,
             unsafe_allow_html=True,
         )
 
-        for item in social["items"]:
-            sentiment_class = (
-                "qf-pill-positive"
-                if item["sentiment"] == "Positive"
-                else "qf-pill-negative"
-                if item["sentiment"] == "Negative"
-                else "qf-pill-neutral"
+
+# -----------------------------------------------------------------------------
+# DIAGNOSTICS (hidden admin view: open the app with ?view=diagnostics)
+# -----------------------------------------------------------------------------
+
+@profiled
+def render_diagnostics():
+    st.markdown(
+        '<div class="qf-section-title">Diagnostics</div>',
+        unsafe_allow_html=True,
+    )
+    st.markdown(
+        '<div class="qf-section-subtitle">'
+        "Render and provider latency across all sessions, background refresh jobs and the shared cache."
+        "</div>",
+        unsafe_allow_html=True,
+    )
+
+    profiler = get_profiler()
+    if not PROFILE_ENABLED:
+        st.info("Profiling is off. Start the app with QF_PROFILE=1 to time render and provider calls.")
+    else:
+        summary = profiler.summary()
+        if summary.empty:
+            st.info("No calls recorded yet.")
+        else:
+            st.dataframe(summary.round(2), hide_index=True, use_container_width=True)
+            with st.expander("Call paths"):
+                st.dataframe(profiler.paths().round(2), hide_index=True, use_container_width=True)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button(
+                "Export JSON", profiler.to_json(), file_name="qf_profile.json", mime="application/json", key="diag_json"
             )
-            st.markdown(
-                f"""
-                <div class="qf-card" style="margin-bottom: 0.5rem;">
-                    <div style="display: flex; justify-content: space-between; align-items: center;">
-                        <div style="font-size: 12px; color: #9ca3af;">
-                            {item['source']} · {item['handle']} · {item['time']}
-                        </div>
-                        <span class="qf-pill {sentiment_class}">
-                            {item['sentiment']}
-                        </span>
-                    </div>
-                    <div style="font-size: 12px; color: #e5e7eb; margin-top: 4px;">
-                        <span class="qf-ticker-pill">{item['ticker']}</span> {item['text']}
-                    </div>
-                    <div style="font-size: 11px; color: #9ca3af; margin-top: 4px;">
-                        Historical pattern: {item['pattern']}
-                    </div>
-                </div>
-                """,
-                unsafe_allow_html=True,
+        with col2:
+            st.download_button(
+                "Export CSV", summary.to_csv(index=False), file_name="qf_profile.csv", mime="text/csv", key="diag_csv"
             )
+        with col3:
+            if st.button("Reset timings", key="diag_reset"):
+                profiler.reset()
+                rerun_app()
+
+    st.markdown(
+        '<div class="qf-section-title" style="font-size: 14px;">Background refresh</div>',
+        unsafe_allow_html=True,
+    )
+    status = pd.DataFrame.from_dict(get_refresh_scheduler().status(), orient="index")
+    st.dataframe(status.round(1), use_container_width=True)
+
+    tier = get_shared_cache().stats()
+    st.markdown(
+        '<div class="qf-section-title" style="font-size: 14px;">Shared cache</div>',
+        unsafe_allow_html=True,
+    )
+    st.markdown(
+        '<div class="qf-section-subtitle">'
+        f"{tier['bytes'] / 1024**2:,.1f} of {tier['max_bytes'] / 1024**2:,.0f} MB in {tier['size']:,} entries · "
+        f"{tier['evictions']:,} evicted, {tier['expirations']:,} expired, {tier['rejections']:,} too large"
+        "</div>",
+        unsafe_allow_html=True,
+    )
+    namespaces = [get_decision_cache(), get_covariance_cache(), get_sentiment_cache(), get_figure_cache()]
+    frames = getattr(get_market_data_provider(), "frames", None)
+    if frames is not None:
+        namespaces.append(frames)
+    caches = pd.DataFrame.from_dict({ns.name: ns.stats() for ns in namespaces}, orient="index")
+    st.dataframe(caches.round(3), use_container_width=True)
 
 
 # -----------------------------------------------------------------------------
 # Main App
 # -----------------------------------------------------------------------------
 
+@profiled
 def main():
     init_session_state()
     inject_global_styles()
@@ -1712,6 +4996,10 @@ def main():
     render_top_header()
     render_main_nav()
 
+    if st.query_params.get("view") == "diagnostics":
+        del st.query_params["view"]
+        set_page("DIAGNOSTICS")
+
     view = st.session_state["view"]
 
     if view == "HOME":
@@ -1722,6 +5010,8 @@ def main():
         render_news()
     elif view == "ASSET_DETAIL":
         render_asset_detail()
+    elif view == "DIAGNOSTICS":
+        render_diagnostics()
     else:
         render_home()
 
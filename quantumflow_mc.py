@@ -0,0 +1,24 @@
+"""
+Monte Carlo chunk kernel for the QuantumFlow allocation simulator.
+
+Kept out of the dashboard script so process-pool workers can import it by
+name: Streamlit re-creates the script as a fresh __main__ module on every
+run, which functions defined there cannot be pickled by reference against.
+"""
+
+import numpy as np
+
+
+def simulate_portfolio_chunk(task):
+    """Per-path (horizon return, max drawdown) of shape (paths, K) for one chunk."""
+    seed, n_paths, horizon, mean, root = task
+    rng = np.random.default_rng(seed)
+    k = len(mean)
+    # (K, paths, horizon) layout keeps every scan and reduction on the contiguous axis.
+    growth = (root @ rng.standard_normal((k, n_paths * horizon))).reshape(k, n_paths, horizon)
+    growth += (1.0 + mean)[:, None, None]
+    np.cumprod(growth, axis=2, out=growth)
+    peak = np.maximum(growth, 1.0)
+    np.maximum.accumulate(peak, axis=2, out=peak)
+    np.divide(growth, peak, out=peak)
+    return (growth[:, :, -1] - 1.0).T, (peak.min(axis=2) - 1.0).T